@@ -1,10 +1,41 @@
+import os
+
 from crewai import Agent
 
+from cached_llm import RoutedLLM
+from model_router import model_base_url, model_router
+from resource_pool import configure_llm_http, resource_pool
 from tools import agent_tools
 
-search_tool, scrape_tool = agent_tools()
+def create_llm(agent_role=""):
+    """
+    Return the LLM for an agent, streaming tokens so progress is visible while it writes.
+    Each call goes to the model routed for the running task (or agent_role), and
+    completions go through the local completion cache, with hit rates tracked per agent_role.
+    """
+    model = model_router().candidates(agent_role=agent_role)[0]
+    return RoutedLLM(
+        model=model,
+        base_url=model_base_url(model),
+        stream=os.getenv("STREAM_LLM_TOKENS", "1") == "1",
+        agent_role=agent_role,
+    )
+
+def pooled_tools():
+    """Return the search and scrape tools shared by every run, built on first use"""
+    return resource_pool().get("agent_tools", agent_tools)
+
+def pooled_llm(agent_role):
+    """Return the LLM shared by every run for agent_role, built on first use"""
+    configure_llm_http()
+    return resource_pool().get(("llm", agent_role), lambda: create_llm(agent_role))
 
 def create_agents():
+    """
+    Build this run's agents. Agents hold per-run state, so they are new each time;
+    their tools and LLMs come from the process-wide pool.
+    """
+    search_tool, scrape_tool = pooled_tools()
 
     #Agent 1: Venue Coordinator
     venue_coordinator = Agent(
@@ -12,6 +43,7 @@ def create_agents():
         goal = "Identify and book and appropriate venue based on the event requirements",
         
         tools = [search_tool, scrape_tool],
+        llm = pooled_llm("Venue Coordinator"),
         verbose = True,
         
         backstory = (
@@ -19,20 +51,25 @@ def create_agents():
         )
     )
 
-    #Agent 2: Logistic Manager
-    logistic_manager = Agent(
-        role = 'Logistic Manager',
-        goal = (
-            "Manage all the logistics for the event, including catering and equipment"
-        ),
-        
-        tools = [search_tool, scrape_tool],
-        verbose = True,
-        
-        backstory = (
-            "Organized and detail-oriented, you ensure that every logistical aspect of the event from catering to equipment setup is flawlessly executed to create a seamless experience for all attendees."
+    #Agent 2: Logistic Manager, one per logistics task
+    # The scheduler runs one task at a time per agent, so catering and equipment each
+    # get their own Logistic Manager to run side by side (sharing the pooled LLM)
+    def logistic_manager(goal):
+        return Agent(
+            role = 'Logistic Manager',
+            goal = goal,
+
+            tools = [search_tool, scrape_tool],
+            llm = pooled_llm('Logistic Manager'),
+            verbose = True,
+
+            backstory = (
+                "Organized and detail-oriented, you ensure that every logistical aspect of the event from catering to equipment setup is flawlessly executed to create a seamless experience for all attendees."
+            )
         )
-    )
+
+    catering_manager = logistic_manager("Arrange the catering for the event")
+    equipment_manager = logistic_manager("Arrange the equipment rental and setup for the event")
 
     #Agent 3: Marketing and Communications Agent
     marketing_communications_agent = Agent(
@@ -40,6 +77,7 @@ def create_agents():
         goal = "Effectively market the event and communicate with the participants.",
         
         tools = [search_tool, scrape_tool],
+        llm = pooled_llm('Marketing and Communications Agent'),
         verbose = True,
         
         backstory = (
@@ -47,4 +85,4 @@ def create_agents():
         )
     )
 
-    return venue_coordinator, logistic_manager, marketing_communications_agent
\ No newline at end of file
+    return venue_coordinator, catering_manager, equipment_manager, marketing_communications_agent
\ No newline at end of file
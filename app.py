@@ -1,11 +1,26 @@
 import streamlit as st
 import warnings
 import os
-import json
 from datetime import datetime
-from pydantic import BaseModel
 from dotenv import load_dotenv
 
+from artifacts import artifact_store, new_run_id
+from checkpoints import checkpoint_store
+from context_compactor import compaction_stats
+from jobs import CANCELLED, FAILED, QUEUED, RUNNING, job_manager
+from llm_cache import completion_cache
+from model_router import model_router
+from page_reducer import reduction_stats
+from plan_cache import format_age
+from plan_history import DEFAULT_PAGE_SIZE, plan_history
+from planner import execute_with_crewai, load_past_plan, lookup_cached_plan
+from progress import ProgressReporter
+from render_cache import render_cache
+from rate_limiter import governor
+from resource_pool import resource_pool
+from tracing import tracer
+import warmup
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -29,13 +44,18 @@ if 'event_details' not in st.session_state:
     st.session_state.event_details = {}
 if 'planning_started' not in st.session_state:
     st.session_state.planning_started = False
-
-# Define VenueDetails model
-class VenueDetails(BaseModel):
-    name: str
-    address: str
-    capacity: int
-    booking_status: str
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None
+if 'run_id' not in st.session_state:
+    st.session_state.run_id = None
+if 'job_error' not in st.session_state:
+    st.session_state.job_error = None
+if 'show_results' not in st.session_state:
+    st.session_state.show_results = False
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 0
+if 'base_run_id' not in st.session_state:
+    st.session_state.base_run_id = None
 
 def configure_api_keys():
     with st.sidebar:
@@ -56,7 +76,7 @@ def configure_api_keys():
                 if openai_api_key and serper_api_key:
                     # Set environment variables
                     os.environ["OPENAI_API_KEY"] = openai_api_key
-                    os.environ["OPENAI_MODEL_NAME"] = "gpt-4o-mini"
+                    os.environ.setdefault("OPENAI_MODEL_NAME", "gpt-4o-mini")
                     os.environ["SERPER_API_KEY"] = serper_api_key
                     
                     st.session_state.api_keys_configured = True
@@ -68,7 +88,7 @@ def configure_api_keys():
             # Auto-configure if keys are already in environment
             if default_openai and default_serper and not st.session_state.api_keys_configured:
                 os.environ["OPENAI_API_KEY"] = default_openai
-                os.environ["OPENAI_MODEL_NAME"] = "gpt-4o-mini"
+                os.environ.setdefault("OPENAI_MODEL_NAME", "gpt-4o-mini")
                 os.environ["SERPER_API_KEY"] = default_serper
                 st.session_state.api_keys_configured = True
                 st.success("✅ API Keys loaded from environment!")
@@ -176,7 +196,7 @@ def main_interface():
         
         with cola4_2:
             if st.button("🔄 Reset Application"):
-                for key in ['planning_started', 'crew_result', 'event_details']:
+                for key in ['planning_started', 'crew_result', 'event_details', 'job_id', 'run_id', 'job_error', 'show_results']:
                     if key in st.session_state:
                         del st.session_state[key]
                 st.rerun()
@@ -234,41 +254,96 @@ def execute_event_planning():
     
     # Option to use real CrewAI agents
     use_real_agents = st.checkbox("🤖 Use Real CrewAI Agents (requires proper setup)", value=False)
+
+    # Identical event details reuse a cached plan unless a refresh is forced
+    colc1, colc2 = st.columns([1, 1])
+    with colc1:
+        force_refresh = st.checkbox("♻️ Force refresh (ignore cached plans)", value=False, disabled=not use_real_agents)
+    with colc2:
+        max_cache_age_hours = st.number_input(
+            "Reuse cached plans up to (hours old)",
+            min_value=0.0,
+            value=24.0,
+            step=1.0,
+            disabled=not use_real_agents or force_refresh,
+        )
+
+    # Tweaking a finished plan only re-runs the tasks whose inputs changed
+    incremental = False
+    if st.session_state.base_run_id:
+        incremental = st.checkbox(
+            "🧩 Only re-run tasks affected by changed details (reuse the last plan's other outputs)",
+            value=True,
+            disabled=not use_real_agents,
+        )
     
     # Execute button
-    if st.button("🚀 Execute Planning", type="primary"):
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        try:
-            if use_real_agents:
-                # Try to use real CrewAI agents
-                status_text.text("🤖 Initializing CrewAI agents...")
-                progress_bar.progress(0.1)
-                result = execute_with_crewai()
-                st.session_state.crew_result = result
-            else:
-                # Use simulated execution
-                status_text.text("🏢 Processing venue coordination...")
-                progress_bar.progress(0.3)
-                
-                status_text.text("📦 Handling logistics arrangements...")
-                progress_bar.progress(0.6)
-                
-                status_text.text("📢 Developing marketing strategy...")
-                progress_bar.progress(0.9)
+    if st.button("🚀 Execute Planning", type="primary", disabled=st.session_state.job_id is not None):
+        st.session_state.crew_result = None
+        st.session_state.job_error = None
+        st.session_state.show_results = False
+        # Every run gets its own artifact namespace so concurrent sessions never collide
+        st.session_state.run_id = new_run_id()
+
+        cached_result = None
+        if use_real_agents and not force_refresh:
+            cached_result = lookup_cached_plan(
+                st.session_state.event_details,
+                max_age=max_cache_age_hours * 3600,
+                run_id=st.session_state.run_id,
+            )
+
+        if cached_result is not None:
+            st.session_state.crew_result = cached_result
+            st.session_state.show_results = True
+        elif use_real_agents:
+            # Real crews run on the shared worker pool so reruns don't interrupt them
+            reporter = ProgressReporter()
+            st.session_state.job_id = job_manager().submit(
+                execute_with_crewai,
+                dict(st.session_state.event_details),
+                description=st.session_state.event_details.get('event_topic', ''),
+                progress=reporter,
+                reporter=reporter,
+                run_id=st.session_state.run_id,
+                use_cache=False,
+                base_run_id=st.session_state.base_run_id if incremental else None,
+                cancellable=True,
+            )
+        else:
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+
+            # Use simulated execution
+            status_text.text("🏢 Processing venue coordination...")
+            progress_bar.progress(0.3)
+            
+            status_text.text("📦 Handling logistics arrangements...")
+            progress_bar.progress(0.6)
+            
+            status_text.text("📢 Developing marketing strategy...")
+            progress_bar.progress(0.9)
             
             # Show final result
             progress_bar.progress(1.0)
             status_text.text("✅ Event planning completed successfully!")
-            
-            # Show results
-            display_results()
-            
-        except Exception as e:
-            st.error(f"❌ Error during execution: {str(e)}")
-            st.error("Falling back to simulated results...")
-            display_results()
+            st.session_state.show_results = True
+
+    if st.session_state.job_id:
+        show_job_status()
+
+    if st.session_state.show_results:
+        if st.session_state.job_error:
+            st.error(f"❌ Error during execution: {st.session_state.job_error}")
+            checkpoint = checkpoint_store().load(st.session_state.run_id) if st.session_state.run_id else None
+            if checkpoint is not None:
+                st.warning(f"💾 Finished before the run stopped: {', '.join(checkpoint[1])}")
+                if st.button("▶️ Resume from the saved tasks", type="primary"):
+                    resume_run(st.session_state.run_id, checkpoint[0])
+            if not st.session_state.crew_result:
+                st.error("Falling back to simulated results...")
+        # Show results
+        display_results()
     
     st.markdown("---")
     st.markdown(
@@ -283,48 +358,104 @@ def execute_event_planning():
             unsafe_allow_html=True
         )
 
-def execute_with_crewai():
-    """Execute planning using real CrewAI agents"""
-    try:
-        from agents import create_agents
-        from tasks import agent_tasks
-        from crewai import Crew
-        
-        # Create agents
-        venue_coordinator, logistic_manager, marketing_communications_agent = create_agents()
-        
-        # Create tasks
-        venue_task, logistics_task, marketing_task = agent_tasks(
-            venue_coordinator, logistic_manager, marketing_communications_agent
-        )
-        
-        # Create and execute crew
-        event_management_crew = Crew(
-            agents=[venue_coordinator, logistic_manager, marketing_communications_agent],
-            tasks=[venue_task, logistics_task, marketing_task],
-            verbose=True,
-            max_execution_time=300,  # 5 minutes timeout
-            memory=False  # Disable memory to avoid issues
-        )
-        
-        # Execute crew with timeout and error handling
-        try:
-            result = event_management_crew.kickoff(inputs=st.session_state.event_details)
-            return result
-        except Exception as exec_error:
-            st.error(f"⚠️ Crew execution error: {str(exec_error)}")
-            return None
-        
-    except ImportError as imp_error:
-        st.error(f"❌ Import error: {str(imp_error)}. Please check if all dependencies are installed.")
-        return None
-    except Exception as e:
-        st.error(f"❌ CrewAI execution failed: {str(e)}")
-        return None
+def resume_run(run_id, event_details):
+    """Continue an interrupted real crew run from its checkpoints on the worker pool"""
+    if run_id in job_manager().active_run_ids():
+        # Another session resumed it first
+        st.warning("This run is already being resumed.")
+        return
+    reporter = ProgressReporter()
+    st.session_state.event_details = event_details
+    st.session_state.run_id = run_id
+    st.session_state.crew_result = None
+    st.session_state.job_error = None
+    st.session_state.show_results = False
+    st.session_state.planning_started = True
+    st.session_state.job_id = job_manager().submit(
+        execute_with_crewai,
+        dict(event_details),
+        description=event_details.get('event_topic', ''),
+        progress=reporter,
+        reporter=reporter,
+        run_id=run_id,
+        use_cache=False,
+        resume=True,
+        cancellable=True,
+    )
+    st.rerun()
+
+@st.fragment(run_every=1)
+def show_job_status():
+    """Poll the background planning job and collect its result once it finishes"""
+    manager = job_manager()
+    job = manager.get(st.session_state.job_id)
+
+    if job is None:
+        st.session_state.job_id = None
+        st.session_state.job_error = "The planning job is no longer available."
+        st.session_state.show_results = True
+        st.rerun()
+
+    if job.status in (QUEUED, RUNNING):
+        if job.status == QUEUED:
+            st.info(f"⏳ Waiting for a free worker... position {manager.queue_position(job.id)} in queue")
+        else:
+            st.info(f"🤖 CrewAI agents are working... ({job.elapsed:.0f}s elapsed)")
+            if job.progress is not None:
+                show_progress(job.progress.drain())
+        # Stops the run at its next check; tasks that already finished are kept
+        if job.cancel_event.is_set():
+            st.caption("⏹️ Cancelling... finished tasks are kept.")
+        elif st.button("⏹️ Cancel planning", key="cancel_job"):
+            manager.cancel(job.id)
+            st.rerun(scope="fragment")
+    else:
+        # A timed out or cancelled run still carries the tasks that finished
+        partial = getattr(job.error, "partial", None)
+        if partial is not None and partial.tasks_output:
+            st.session_state.crew_result = partial
+        if job.status == CANCELLED:
+            st.session_state.job_error = "Planning was cancelled."
+        elif job.status == FAILED:
+            if isinstance(job.error, ImportError):
+                st.session_state.job_error = f"Import error: {str(job.error)}. Please check if all dependencies are installed."
+            else:
+                st.session_state.job_error = f"CrewAI execution failed: {str(job.error)}"
+        else:
+            st.session_state.crew_result = job.result
+            st.session_state.base_run_id = job.result.run_id
+        manager.forget(job.id)
+        st.session_state.job_id = None
+        st.session_state.show_results = True
+        st.rerun()
+
+def show_progress(snapshot):
+    """Render a live progress snapshot from the running crew"""
+    running = ", ".join(f"{agent or 'Agent'}" for agent in snapshot['running'].values())
+    st.progress(
+        snapshot['fraction'],
+        text=f"{snapshot['completed']}/{snapshot['total']} tasks done"
+        + (f" · working: {running}" if running else ""),
+    )
+    st.caption(f"🔁 {snapshot['steps']} agent steps · 🛠️ {snapshot['tool_calls']} tool calls")
+
+    if snapshot['tokens']:
+        with st.expander("✍️ Live agent output", expanded=True):
+            st.text(snapshot['tokens'])
+    if snapshot['log']:
+        with st.expander("📜 Activity", expanded=False):
+            for line in reversed(snapshot['log']):
+                st.text(line)
 
 def display_results():
 
     """Display the planning results"""
+    # Reports and download payloads are built once per run, not on every rerun
+    artifacts = artifact_store().get(st.session_state.run_id) if st.session_state.run_id else None
+    rendered = render_cache().get(
+        st.session_state.run_id, st.session_state.event_details, st.session_state.crew_result, artifacts
+    )
+
     st.success("✅ Event planning completed successfully!")
     
     st.header("📊 Planning Results")
@@ -332,113 +463,283 @@ def display_results():
     # Show real CrewAI results if available
     if st.session_state.crew_result:
         st.subheader("🤖 CrewAI Agent Results")
+        cache_age = getattr(st.session_state.crew_result, 'cache_age', None)
+        if cache_age is not None:
+            st.info(f"♻️ Served from the plan cache, generated {format_age(cache_age)} ago. Tick 'Force refresh' to plan again.")
+        history_created_at = getattr(st.session_state.crew_result, 'history_created_at', None)
+        if history_created_at is not None:
+            st.info(f"🗂️ Opened from the plan history, generated {datetime.fromtimestamp(history_created_at):%Y-%m-%d %H:%M}.")
+        crew_result = st.session_state.crew_result
+        incomplete = getattr(crew_result, 'incomplete', [])
+        if incomplete:
+            st.warning(f"⚠️ Partial results: {', '.join(incomplete)} did not finish. Showing the tasks that did.")
+        cut_off = [
+            output.name
+            for output, was_cut_off in zip(crew_result.tasks_output, getattr(crew_result, 'cut_off', []))
+            if was_cut_off
+        ]
+        if cut_off:
+            st.warning(f"⏱️ {', '.join(cut_off)} ran out of time; the best shortlisted venue was used instead.")
+        reused = [
+            output.name
+            for output, was_reused in zip(crew_result.tasks_output, getattr(crew_result, 'reused', []))
+            if was_reused
+        ]
+        if reused and history_created_at is None:
+            st.info(f"🧩 Inputs unchanged for {', '.join(reused)}; reused the previous plan's output instead of running it again.")
         with st.expander("📄 Complete Agent Report", expanded=True):
             if hasattr(st.session_state.crew_result, 'raw'):
-                st.markdown(st.session_state.crew_result.raw)
+                st.markdown(rendered.crew_report)
             else:
-                st.text(str(st.session_state.crew_result))
-    
-    # Create simulated results based on inputs
-    venue_result = {
-        "name": f"{st.session_state.event_details['event_city']} Convention Center",
-        "address": f"123 Event Street, {st.session_state.event_details['event_city']}",
-        "capacity": st.session_state.event_details['expected_participants'] + 50,
-        "booking_status": "Available"
-    }
+                st.text(rendered.crew_report)
     
     # Display results
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("🏢 Venue Details")
-        st.json(venue_result)
+        st.json(rendered.venue_result)
         
         # Download venue details
         st.download_button(
             label="📄 Download Venue Details",
-            data=json.dumps(venue_result, indent=2),
+            data=rendered.venue_json,
             file_name="venue_details.json",
-            mime="application/json"
+            mime="application/json",
+            on_click="ignore"
         )
     
     with col2:
         st.subheader("📢 Marketing Report")
-        marketing_report = f"""# Marketing Strategy Report
-
-        ## Event Overview
-        - **Event**: {st.session_state.event_details['event_topic']}
-        - **Location**: {st.session_state.event_details['event_city']}
-        - **Date**: {st.session_state.event_details['tentative_date']}
-        - **Expected Attendees**: {st.session_state.event_details['expected_participants']}
-
-        """
-                
-        st.markdown(marketing_report)
+        st.markdown(rendered.marketing_report)
         
         # Download marketing report
         st.download_button(
             label="📄 Download Marketing Report",
-            data=marketing_report,
+            data=rendered.marketing_report,
             file_name="marketing_report.md",
-            mime="text/markdown"
+            mime="text/markdown",
+            on_click="ignore"
         )
     
-    # Check for generated files from CrewAI
-    if st.session_state.crew_result:
-        st.subheader("📁 Generated Files")
+    # Show the structured task outputs of this run from the artifact store
+    if st.session_state.crew_result and artifacts:
+        st.subheader("📁 Generated Outputs")
         
-        # Check for venue details JSON file
-        try:
-            if os.path.exists("venue_details.json"):
-                with open("venue_details.json", "r") as f:
-                    real_venue_data = json.load(f)
-                st.success("✅ Real venue details file generated!")
-                with st.expander("🏢 CrewAI Venue Details"):
-                    st.json(real_venue_data)
-        except:
-            pass
+        if rendered.crew_venue_details:
+            st.success("✅ Real venue details generated!")
+            with st.expander("🏢 CrewAI Venue Details"):
+                st.json(rendered.crew_venue_details)
+            st.download_button(
+                label="📄 Download CrewAI Venue Details",
+                data=rendered.crew_venue_json,
+                file_name="venue_details.json",
+                mime="application/json",
+                key="crewai_venue_download",
+                on_click="ignore"
+            )
         
-        # Check for marketing report file
-        try:
-            if os.path.exists("marketing_report.md"):
-                with open("marketing_report.md", "r") as f:
-                    real_marketing_data = f.read()
-                st.success("✅ Real marketing report file generated!")
-                with st.expander("📢 CrewAI Marketing Report"):
-                    st.markdown(real_marketing_data)
-        except:
-            pass
-    
-    # Complete summary download
-    summary_report = f"""# Complete Event Planning Summary
-
-## Event Details
-{json.dumps(st.session_state.event_details, indent=2)}
-
-## Results
-{marketing_report}
-
-## Venue Details
-{json.dumps(venue_result, indent=2)}
-
-## CrewAI Results
-{str(st.session_state.crew_result) if st.session_state.crew_result else "No CrewAI results available"}
-"""
+        if rendered.crew_marketing_report:
+            st.success("✅ Real marketing report generated!")
+            with st.expander("📢 CrewAI Marketing Report"):
+                st.markdown(rendered.crew_marketing_report)
+            st.download_button(
+                label="📄 Download CrewAI Marketing Report",
+                data=rendered.crew_marketing_report,
+                file_name="marketing_report.md",
+                mime="text/markdown",
+                key="crewai_marketing_download",
+                on_click="ignore"
+            )
     
-    st.download_button(
-        label="📄 Download Complete Summary",
-        data=summary_report,
-        file_name="event_planning_summary.md",
-        mime="text/markdown"
-    )
+    # The complete summary embeds the whole agent report, so it is only built once asked for
+    summary_key = f"summary_requested_{st.session_state.run_id}"
+    if st.session_state.get(summary_key):
+        st.download_button(
+            label="📄 Download Complete Summary",
+            data=rendered.summary_report,
+            file_name="event_planning_summary.md",
+            mime="text/markdown",
+            on_click="ignore"
+        )
+    elif st.button("📦 Prepare Complete Summary"):
+        st.session_state[summary_key] = True
+        st.rerun()
     
     # Reset for new planning
     if st.button("🔄 Start New Planning"):
-        for key in ['planning_started', 'crew_result']:
+        for key in ['planning_started', 'crew_result', 'run_id', 'job_error', 'show_results', summary_key]:
             if key in st.session_state:
                 del st.session_state[key]
         st.rerun()
 
+def show_performance():
+    """Sidebar dashboard of recent run traces: a span waterfall and per-stage p50/p95"""
+    traces = tracer().recent_traces()
+    if not traces:
+        return
+    import altair as alt
+    import pandas as pd
+
+    with st.expander("⏱️ Performance"):
+        root = st.selectbox(
+            "Run",
+            traces,
+            format_func=lambda span: (
+                f"{datetime.fromtimestamp(span.start_ns / 1e9):%H:%M:%S} · "
+                f"{span.attributes.get('event_topic') or span.attributes.get('run_id')} · {span.duration:.1f}s"
+            ),
+        )
+        spans = sorted(tracer().spans(root.trace_id), key=lambda span: span.start_ns)
+        waterfall = pd.DataFrame([
+            {
+                "span": f"{i:02d} {span.attributes.get('stage') or span.name}",
+                "start": (span.start_ns - root.start_ns) / 1e9,
+                "end": (span.end_ns - root.start_ns) / 1e9,
+                "seconds": round(span.duration, 3),
+                "cache_hit": span.attributes.get("cache_hit"),
+                "tokens_in": span.attributes.get("tokens_in"),
+                "tokens_out": span.attributes.get("tokens_out"),
+                "cost_usd": span.attributes.get("cost_usd"),
+                "context_before": span.attributes.get("context_tokens_before"),
+                "context_after": span.attributes.get("context_tokens_after"),
+            }
+            for i, span in enumerate(spans)
+        ])
+        st.altair_chart(
+            alt.Chart(waterfall).mark_bar().encode(
+                x=alt.X("start:Q", title="seconds"),
+                x2="end:Q",
+                y=alt.Y("span:N", sort=None, title=None),
+                color=alt.Color("cache_hit:N", title="cache hit"),
+                tooltip=[
+                    "span", "seconds", "cache_hit", "tokens_in", "tokens_out", "cost_usd",
+                    "context_before", "context_after",
+                ],
+            ),
+            use_container_width=True,
+        )
+        cost = waterfall["cost_usd"].dropna().sum()
+        st.caption(f"{len(spans)} spans · estimated LLM cost ${cost:.4f}")
+
+        st.markdown("**Stage latency (recent runs)**")
+        st.dataframe(
+            pd.DataFrame([
+                {"stage": stage, "count": stats["count"], "p50 (s)": stats["p50"], "p95 (s)": stats["p95"]}
+                for stage, stats in tracer().stage_stats().items()
+            ]).round(3),
+            hide_index=True,
+        )
+
+
+def show_plan_history():
+    """Sidebar browser of past plans, filtered and paged in SQLite, that opens a plan without re-running it"""
+    history = plan_history()
+    if not history.stats()["plans"]:
+        return
+    with st.expander("🗂️ Plan History"):
+        city = st.selectbox("City", ["All cities"] + history.cities(), key="history_city")
+        topic = st.text_input("Topic starts with", key="history_topic")
+        dates = st.date_input("Event date between", value=(), key="history_dates")
+        filters = {
+            "city": None if city == "All cities" else city,
+            "topic": topic.strip() or None,
+            "date_from": dates[0].isoformat() if len(dates) > 0 else None,
+            "date_to": dates[1].isoformat() if len(dates) > 1 else None,
+        }
+        # Changing a filter goes back to the first page
+        if st.session_state.get("history_filters") != filters:
+            st.session_state.history_filters = filters
+            st.session_state.history_page = 0
+
+        total = history.count(**filters)
+        pages = max(1, -(-total // DEFAULT_PAGE_SIZE))
+        page = min(st.session_state.history_page, pages - 1)
+        for plan in history.search(**filters, limit=DEFAULT_PAGE_SIZE, offset=page * DEFAULT_PAGE_SIZE):
+            venue = f" · 🏢 {plan['venue_name']}" if plan["venue_name"] else ""
+            st.markdown(
+                f"**{plan['event_topic']}** · {plan['event_city']} · {plan['tentative_date']}{venue}  \n"
+                f"<small>{datetime.fromtimestamp(plan['created_at']):%Y-%m-%d %H:%M} · "
+                f"{plan['expected_participants']} guests</small>",
+                unsafe_allow_html=True,
+            )
+            if st.button("Open", key=f"history_open_{plan['run_id']}", disabled=st.session_state.job_id is not None):
+                loaded = load_past_plan(plan["run_id"])
+                if loaded is None:
+                    st.warning("This plan is no longer in the history.")
+                    continue
+                st.session_state.crew_result, st.session_state.event_details = loaded
+                st.session_state.run_id = plan["run_id"]
+                st.session_state.base_run_id = plan["run_id"]
+                st.session_state.job_error = None
+                st.session_state.planning_started = True
+                st.session_state.show_results = True
+                st.rerun()
+
+        colp1, colp2, colp3 = st.columns([1, 2, 1])
+        with colp1:
+            if st.button("◀", key="history_prev", disabled=page == 0):
+                st.session_state.history_page = page - 1
+                st.rerun()
+        with colp2:
+            st.caption(f"Page {page + 1}/{pages} · {total} plans")
+        with colp3:
+            if st.button("▶", key="history_next", disabled=page >= pages - 1):
+                st.session_state.history_page = page + 1
+                st.rerun()
+
+
+def show_interrupted_runs():
+    """Sidebar list of runs that stopped with checkpointed tasks, e.g. after a timeout or restart"""
+    # Runs still queued or running in any session are checkpointing as they go, not interrupted
+    active = job_manager().active_run_ids()
+    runs = [run for run in checkpoint_store().interrupted_runs() if run["run_id"] not in active]
+    if not runs:
+        return
+    with st.expander("⏸️ Interrupted Runs"):
+        for run in runs:
+            st.markdown(
+                f"**{run['event_details'].get('event_topic')}** · {run['event_details'].get('event_city')}  \n"
+                f"<small>{datetime.fromtimestamp(run['updated_at']):%Y-%m-%d %H:%M} · "
+                f"saved: {', '.join(run['tasks'])}</small>",
+                unsafe_allow_html=True,
+            )
+            colr1, colr2 = st.columns([1, 1])
+            with colr1:
+                if st.button("Resume", key=f"resume_{run['run_id']}", disabled=st.session_state.job_id is not None):
+                    resume_run(run["run_id"], run["event_details"])
+            with colr2:
+                if st.button("Discard", key=f"discard_{run['run_id']}"):
+                    checkpoint_store().discard(run["run_id"])
+                    st.rerun()
+
+
+def show_startup_report():
+    """Sidebar view of the background pre-warm and the import cost of the startup path"""
+    with st.expander("🐢 Startup & Imports"):
+        status = warmup.prewarm_status()
+        if status["state"] == warmup.DONE:
+            st.caption(f"Planning stack pre-warmed in {status['seconds']:.1f}s")
+        elif status["state"] == warmup.FAILED:
+            st.caption(f"Pre-warm failed: {status['error']}")
+        elif status["state"] == warmup.RUNNING:
+            st.caption("Pre-warming the planning stack in the background…")
+
+        # Measured in a fresh interpreter, so it reflects a cold start rather than this process
+        if st.button("Measure import times", key="measure_imports"):
+            from import_report import heaviest, import_report, startup_modules
+
+            report = import_report(startup_modules())
+            st.markdown(f"**Startup imports: {report['total_ms']:.0f} ms**")
+            st.dataframe(
+                [
+                    {"module": f"{'  ' * row['depth']}{row['module']}", "cumulative (ms)": row["cumulative_ms"]}
+                    for row in heaviest(report["rows"])
+                ],
+                hide_index=True,
+            )
+
+
 def main():
     """Main application function"""
     
@@ -458,6 +759,72 @@ def main():
                 st.info("🚀 Planning in progress...")
             else:
                 st.info("⏳ Ready to start planning")
+
+            job_stats = job_manager().stats()
+            st.caption(
+                f"🧵 Workers busy: {job_stats['running']}/{job_stats['max_workers']} · "
+                f"Queued plans: {job_stats['queued']}"
+            )
+
+            llm_cache_stats = completion_cache().stats()
+            if llm_cache_stats:
+                with st.expander("📈 LLM Cache Stats"):
+                    for agent_role, agent_stats in llm_cache_stats.items():
+                        st.markdown(
+                            f"**{agent_role}**: {agent_stats['hit_rate']:.0%} hit rate "
+                            f"({agent_stats['exact_hits']} exact, {agent_stats['near_hits']} near, "
+                            f"{agent_stats['misses']} misses) · ~{agent_stats['saved_seconds']:.0f}s saved"
+                        )
+
+            pool_stats = resource_pool().stats()
+            if pool_stats["resources"]:
+                st.caption(
+                    f"♻️ Warm resources: {len(pool_stats['resources'])} · reused {pool_stats['hits']}× · "
+                    f"rebuilt {pool_stats['refreshes'] + pool_stats['unhealthy']}×"
+                )
+
+            reduction = reduction_stats()
+            if reduction["calls"]:
+                st.caption(
+                    f"✂️ Page reduction: {reduction['calls']} pages · "
+                    f"{reduction['tokens_before']:,} → {reduction['tokens_after']:,} tokens "
+                    f"({reduction['tokens_saved']:,} saved)"
+                )
+
+            compaction = compaction_stats()
+            if compaction["contexts"]:
+                st.caption(
+                    f"🗜️ Context compaction: {compaction['contexts']} contexts · "
+                    f"{compaction['tokens_before']:,} → {compaction['tokens_after']:,} tokens "
+                    f"({compaction['tokens_saved']:,} saved)"
+                )
+
+            routing_stats = model_router().stats()
+            if routing_stats:
+                with st.expander("🧭 Model Routing"):
+                    for model, model_stats in routing_stats.items():
+                        p50, p95 = model_stats["p50"], model_stats["p95"]
+                        st.markdown(
+                            f"**{model}**: {model_stats['calls']} recent calls · "
+                            f"p50 {p50 or 0:.1f}s / p95 {p95 or 0:.1f}s · "
+                            f"{model_stats['error_rate']:.0%} errors · {model_stats['fallbacks']} fallbacks"
+                        )
+
+            outbound_stats = governor().stats()
+            if outbound_stats:
+                with st.expander("🚦 Outbound Traffic"):
+                    for target, target_stats in outbound_stats.items():
+                        st.markdown(
+                            f"**{target}**: {target_stats['requests']} requests · "
+                            f"{target_stats['retries']} retries · {target_stats['failures']} failed · "
+                            f"queued {target_stats['mean_queued_seconds']:.2f}s avg / "
+                            f"{target_stats['max_queued_seconds']:.2f}s max"
+                        )
+
+            show_plan_history()
+            show_interrupted_runs()
+            show_performance()
+            show_startup_report()
             
             # Reset button
             st.markdown("---")
@@ -580,6 +947,8 @@ def main():
                     unsafe_allow_html=True
                 )
 
+    # The page is on screen by now; load crewai and build the pooled clients off the script thread
+    warmup.start_prewarm(build_resources=st.session_state.api_keys_configured)
 
 
 if __name__ == "__main__":
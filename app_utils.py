@@ -21,7 +21,7 @@ def enter_and_set_api_keys(streamlit_mode=True):
             print("Both OpenAI and Serper API keys are required.")
             exit(1)
     os.environ["OPENAI_API_KEY"] = openai_api_key
-    os.environ["OPENAI_MODEL_NAME"] = "gpt-4o-mini"
+    os.environ.setdefault("OPENAI_MODEL_NAME", "gpt-4o-mini")
     os.environ["SERPER_API_KEY"] = serper_api_key
     return openai_api_key, serper_api_key
 
@@ -0,0 +1,105 @@
+# Per-run artifact namespace so concurrent sessions never share output files
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+# Task names set in tasks.agent_tasks()
+VENUE_TASK = "venue_task"
+CATERING_TASK = "catering_task"
+EQUIPMENT_TASK = "equipment_task"
+MARKETING_TASK = "marketing_task"
+# Plans recorded before logistics was split into catering and equipment
+LOGISTICS_TASK = "logistics_task"
+
+DEFAULT_RUNS_DIR = "runs"
+
+
+def new_run_id():
+    """Return a unique, time-sortable run ID"""
+    return datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8]
+
+
+def run_dir(run_id):
+    """Return the directory a run's files are written to, if files are wanted at all"""
+    return os.path.join(os.getenv("EVENT_PLANNER_RUNS_DIR", DEFAULT_RUNS_DIR), run_id)
+
+
+class RunArtifacts:
+    """Structured task outputs of one planning run, keyed by task name"""
+
+    def __init__(self, run_id, outputs, created_at=None):
+        self.run_id = run_id
+        self.outputs = outputs
+        self.created_at = created_at or time.time()
+
+    @classmethod
+    def from_result(cls, run_id, result):
+        """Build the artifacts from a scheduler.PlanResult"""
+        return cls(run_id, {task["name"]: task for task in result.to_dict()["tasks"]})
+
+    def raw(self, task_name):
+        return (self.outputs.get(task_name) or {}).get("raw") or ""
+
+    @property
+    def venue_details(self):
+        """The venue task's VenueDetails as a dict, or None if it produced no valid JSON"""
+        output = self.outputs.get(VENUE_TASK) or {}
+        if output.get("json_dict"):
+            return output["json_dict"]
+        try:
+            return json.loads(output.get("raw") or "")
+        except ValueError:
+            return None
+
+    @property
+    def logistics(self):
+        parts = [self.raw(CATERING_TASK), self.raw(EQUIPMENT_TASK)]
+        return "\n\n".join(part for part in parts if part) or self.raw(LOGISTICS_TASK)
+
+    @property
+    def marketing_report(self):
+        return self.raw(MARKETING_TASK)
+
+    def to_dict(self):
+        return {"run_id": self.run_id, "created_at": self.created_at, "outputs": self.outputs}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["run_id"], data["outputs"], data.get("created_at"))
+
+
+class ArtifactStore:
+    """In-memory store of recent runs' artifacts, evicting the oldest beyond max_runs"""
+
+    def __init__(self, max_runs=100):
+        self.max_runs = max_runs
+        self._runs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, artifacts):
+        with self._lock:
+            self._runs[artifacts.run_id] = artifacts
+            self._runs.move_to_end(artifacts.run_id)
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+
+    def get(self, run_id):
+        with self._lock:
+            return self._runs.get(run_id)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def artifact_store():
+    """Return the process-wide artifact store shared by every session"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore(max_runs=int(os.getenv("ARTIFACT_STORE_MAX_RUNS", 100)))
+        return _store
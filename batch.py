@@ -0,0 +1,162 @@
+# Headless batch planning: runs many events from a CSV/JSONL file across a worker pool
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from planner import DEFAULT_MAX_EXECUTION_TIME
+
+EVENT_FIELDS = [
+    'event_topic', 'event_description', 'event_city', 'tentative_date',
+    'expected_participants', 'budget', 'venue_type',
+]
+
+INT_FIELDS = ['expected_participants', 'budget']
+
+
+class InvalidEvent(ValueError):
+    """An input record that can't be planned; record is what was read, if anything"""
+
+    def __init__(self, message, record=None):
+        super().__init__(message)
+        self.record = record
+
+
+def load_events(path):
+    """
+    Read event_details records from a .csv or .jsonl file. A record that can't be
+    parsed or normalized is returned in its place as an InvalidEvent, so one bad
+    line fails only its own event.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [line for line in f if line.strip()]
+    events = []
+    for row in rows:
+        record = row if isinstance(row, dict) else None
+        try:
+            if record is None:
+                record = json.loads(row)
+            events.append(normalize_event(record))
+        except (ValueError, TypeError) as e:
+            events.append(InvalidEvent(f"{type(e).__name__}: {e}", record if record is not None else row.strip()))
+    return events
+
+
+def normalize_event(record):
+    """Return the record with the same keys and types main_interface() builds"""
+    if not isinstance(record, dict):
+        raise ValueError(f"Event record is not an object: {record}")
+    missing = [field for field in EVENT_FIELDS if record.get(field) in (None, "")]
+    if missing:
+        raise ValueError(f"Event record is missing {', '.join(missing)}: {record}")
+    event_details = {field: record[field] for field in EVENT_FIELDS}
+    for field in INT_FIELDS:
+        event_details[field] = int(float(event_details[field]))
+    return event_details
+
+
+def plan_one(index, event_details, timeout):
+    """Plan a single event and return a JSON-serializable record; never raises"""
+    from planner import execute_with_crewai
+
+    started = time.time()
+    record = {"index": index, "event_details": event_details}
+    try:
+        result = execute_with_crewai(event_details, max_execution_time=timeout)
+        record.update(status="done", result=result.to_dict())
+    except Exception as e:
+        record.update(status="failed", error=f"{type(e).__name__}: {e}")
+        # A timed out run still reports the tasks that finished
+        partial = getattr(e, "partial", None)
+        if partial is not None:
+            record["partial_result"] = partial.to_dict()
+    record["elapsed"] = time.time() - started
+    return record
+
+
+def run_batch(events, output_path, workers=2, mode="process", timeout=DEFAULT_MAX_EXECUTION_TIME, verbose=False):
+    """
+    Plan every event on a pool of workers, appending each result to output_path as
+    soon as it finishes. A failed event, including an InvalidEvent from
+    load_events(), is recorded and does not stop the others.
+    Returns (succeeded, failed) counts.
+    """
+    pool_class = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+    succeeded = failed = 0
+
+    def report(record):
+        nonlocal succeeded, failed
+        out.write(json.dumps(record, default=str) + "\n")
+        out.flush()
+
+        if record["status"] == "done":
+            succeeded += 1
+        else:
+            failed += 1
+        event_details = record["event_details"]
+        topic = event_details.get("event_topic") if isinstance(event_details, dict) else None
+        label = topic or f"record {record['index']}"
+        print(f"[{succeeded + failed}/{len(events)}] {label}: {record['status']}", file=sys.stderr)
+        if verbose:
+            from app_utils import pretty_print_result
+            pretty_print_result(record)
+
+    with pool_class(max_workers=workers) as pool, open(output_path, "a", encoding="utf-8") as out:
+        futures = {}
+        for index, event_details in enumerate(events):
+            if isinstance(event_details, InvalidEvent):
+                report({
+                    "index": index,
+                    "event_details": event_details.record,
+                    "status": "failed",
+                    "error": str(event_details),
+                })
+            else:
+                futures[pool.submit(plan_one, index, event_details, timeout)] = index
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. a crashed process)
+                record = {
+                    "index": futures[future],
+                    "event_details": events[futures[future]],
+                    "status": "failed",
+                    "error": f"{type(e).__name__}: {e}",
+                }
+            report(record)
+    return succeeded, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan events in batch without the Streamlit UI")
+    parser.add_argument("input", help="CSV or JSONL file of event_details records")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("-w", "--workers", type=int, default=2, help="number of events planned at once")
+    parser.add_argument("--mode", choices=["process", "thread"], default="process", help="worker pool type")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_MAX_EXECUTION_TIME, help="seconds allowed per event")
+    parser.add_argument("-v", "--verbose", action="store_true", help="pretty print each result")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    if os.getenv("OPENAI_API_KEY") and os.getenv("SERPER_API_KEY"):
+        os.environ.setdefault("OPENAI_MODEL_NAME", "gpt-4o-mini")
+    else:
+        from app_utils import enter_and_set_api_keys
+        enter_and_set_api_keys(streamlit_mode=False)
+
+    events = load_events(args.input)
+    succeeded, failed = run_batch(events, args.output, args.workers, args.mode, args.timeout, args.verbose)
+    print(f"✅ {succeeded} planned, ❌ {failed} failed. Results in {args.output}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
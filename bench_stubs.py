@@ -0,0 +1,256 @@
+# Local stub backends for benchmarking: an OpenAI-compatible LLM, a Serper-style search API and venue pages
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SEARCH_TOOL_NAME = "Search the internet with Serper"
+SCRAPE_TOOL_NAME = "Read website content"
+
+
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+
+class StubStats:
+    """Thread-safe counters of what the stub backends served"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.llm_calls = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.search_calls = 0
+            self.scrape_calls = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "llm_calls": self.llm_calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "search_calls": self.search_calls,
+                "scrape_calls": self.scrape_calls,
+            }
+
+
+def scripted_completion(messages, base_url):
+    """
+    Return the next ReAct turn for the agent in messages: search first, then scrape
+    the first link found, then a final answer in the shape the task expects.
+    """
+    text = "\n".join(str(message.get("content") or "") for message in messages)
+    # The ReAct format instructions themselves mention "Observation: the result of the action"
+    observations = len(re.findall(r"Observation:(?! the result of the action)", text))
+
+    if observations == 0:
+        city = re.search(r"venue in ([^\n.]+?) that", text)
+        query = f"event venues {city.group(1)}" if city else "event services"
+        return (
+            "Thought: I should search for options first.\n"
+            f"Action: {SEARCH_TOOL_NAME}\n"
+            f'Action Input: {{"search_query": "{query}"}}'
+        )
+    if observations == 1:
+        link = re.search(r"(https?://[^\s\"']+/venue/\d+)", text)
+        url = link.group(1) if link else f"{base_url}/venue/1"
+        return (
+            "Thought: I should read the most promising page.\n"
+            f"Action: {SCRAPE_TOOL_NAME}\n"
+            f'Action Input: {{"website_url": "{url}"}}'
+        )
+
+    if "Venue Coordinator" in text:
+        answer = json.dumps({
+            "name": "Stub Grand Hall",
+            "address": "1 Benchmark Way",
+            "capacity": 600,
+            "booking_status": "Available",
+        })
+    elif "Logistic Manager" in text:
+        answer = (
+            "Catering confirmed for all participants with vegetarian options. "
+            "AV equipment, staging and seating rental booked; setup starts the evening before."
+        )
+    else:
+        answer = (
+            "# Marketing Report\n\n## Channels\n- Email campaign\n- LinkedIn ads\n- Partner communities\n\n"
+            "## Engagement\nProjected registrations meet the attendance target."
+        )
+    return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+
+def venue_page(n):
+    return f"""<html><head><title>Venue {n}</title><script>var tracking = true;</script></head>
+<body><nav><a href="/">Home</a><a href="/about">About</a></nav>
+<h1>Stub Venue {n}</h1>
+<p>Our main ballroom has capacity for {300 + n * 100} guests banquet style.</p>
+<p>Address: {n} Benchmark Street, Stub City</p>
+<p>Packages from ${40 + n * 5} per person, minimum spend applies.</p>
+<p>Contact events@venue{n}.example or call 555-010{n}.</p>
+<footer>© Stub Venues. All rights reserved.</footer></body></html>"""
+
+
+class StubServer:
+    """
+    Serves /v1/chat/completions (plain and streamed), /search and /venue/<n> on
+    localhost, each after its configured latency, counting what it served.
+    Chat requests for a model in failing_models get a 503.
+    """
+
+    def __init__(self, llm_latency=0.05, search_latency=0.02, scrape_latency=0.02, port=0,
+                 model_latencies=None, failing_models=()):
+        self.llm_latency = llm_latency
+        # Per-model overrides, to exercise latency-aware routing and fallback
+        self.model_latencies = dict(model_latencies or {})
+        self.failing_models = set(failing_models)
+        self.search_latency = search_latency
+        self.scrape_latency = scrape_latency
+        self.stats = StubStats()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _json(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_POST(self):
+                if self.path.endswith("/chat/completions"):
+                    return self._chat(self._body())
+                if self.path.rstrip("/").endswith("/search"):
+                    return self._search(self._body())
+                self._json({"error": "not found"}, 404)
+
+            def do_GET(self):
+                match = re.search(r"/venue/(\d+)", self.path)
+                if not match:
+                    return self._json({"error": "not found"}, 404)
+                time.sleep(stub.scrape_latency)
+                stub.stats.add(scrape_calls=1)
+                body = venue_page(int(match.group(1))).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _search(self, payload):
+                time.sleep(stub.search_latency)
+                stub.stats.add(search_calls=1)
+                query = payload.get("q", "")
+                self._json({
+                    "searchParameters": {"q": query},
+                    "organic": [
+                        {
+                            "title": f"Stub Venue {i}",
+                            "link": f"{stub.base_url}/venue/{i}",
+                            "snippet": f"Stub result {i} for {query}",
+                            "position": i,
+                        }
+                        for i in range(1, 4)
+                    ],
+                })
+
+            def _chat(self, payload):
+                model = payload.get("model", "stub")
+                time.sleep(stub.model_latencies.get(model, stub.llm_latency))
+                if model in stub.failing_models:
+                    return self._json({"error": {"message": f"{model} is unavailable", "type": "server_error"}}, 503)
+                messages = payload.get("messages", [])
+                content = scripted_completion(messages, stub.base_url)
+                prompt_tokens = estimate_tokens(json.dumps(messages))
+                completion_tokens = estimate_tokens(content)
+                stub.stats.add(llm_calls=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                }
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+                if not payload.get("stream"):
+                    return self._json({
+                        "id": completion_id,
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": usage,
+                    })
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                words = re.findall(r"\S+\s*", content)
+                for i in range(0, len(words), 8):
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": "".join(words[i:i + 8])}, "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                    "usage": usage,
+                }
+                self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+        return Handler
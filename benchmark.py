@@ -0,0 +1,242 @@
+# End-to-end benchmark of the planning pipeline against local stub backends
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_EVENT = {
+    'event_topic': "Tech Innovation Conference",
+    'event_description': "A gathering of tech innovators and industry leaders.",
+    'event_city': "San Francisco",
+    'tentative_date': "2025-11-15",
+    'expected_participants': 500,
+    'budget': 20000,
+    'venue_type': "Conference Center",
+}
+
+# Metrics where a higher value is better; every other numeric metric is lower-is-better
+HIGHER_IS_BETTER = {"throughput_plans_per_s"}
+
+
+def percentile(values, q):
+    """Return the q-th percentile (0-100) of values using linear interpolation"""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def configure_environment(stub, warm=False):
+    """Point the LLM and tools at the stub server and isolate the caches"""
+    os.environ["OPENAI_API_KEY"] = "sk-benchmark"
+    os.environ["OPENAI_BASE_URL"] = f"{stub.base_url}/v1"
+    os.environ["OPENAI_API_BASE"] = f"{stub.base_url}/v1"
+    os.environ.setdefault("OPENAI_MODEL_NAME", "gpt-4o-mini")
+    os.environ["SERPER_API_KEY"] = "benchmark"
+    os.environ["SERPER_BASE_URL"] = stub.base_url
+    if not warm:
+        # Cold caches so every stage does its full work
+        os.environ["EVENT_PLANNER_CACHE_DIR"] = tempfile.mkdtemp(prefix="planner-bench-")
+        os.environ["LLM_CACHE"] = "0"
+
+
+def run_plan(event_details):
+    from planner import execute_with_crewai
+    from progress import ProgressReporter
+
+    reporter = ProgressReporter()
+    started = time.monotonic()
+    try:
+        result = execute_with_crewai(event_details, reporter=reporter, use_cache=False)
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}", "elapsed": time.monotonic() - started}
+    snapshot = reporter.drain()
+    return {
+        "ok": True,
+        "elapsed": time.monotonic() - started,
+        "tasks": {
+            (getattr(task, "name", None) or str(i)): duration
+            for i, (task, duration) in enumerate(zip(result.tasks, result.task_durations))
+        },
+        "tool_calls": snapshot["tool_calls"],
+        "context_tokens": {
+            (getattr(task, "name", None) or str(i)): sizes
+            for i, (task, sizes) in enumerate(zip(result.tasks, result.context_sizes)) if sizes
+        },
+    }
+
+
+def run_level(stub, concurrency, repeats):
+    """Run concurrency plans at once, repeats times, and summarize the level"""
+    runs = []
+    stub.stats.reset()
+    wall = 0.0
+    for _ in range(repeats):
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            runs.extend(pool.map(run_plan, [dict(BENCH_EVENT) for _ in range(concurrency)]))
+        wall += time.monotonic() - started
+
+    ok = [run for run in runs if run["ok"]]
+    plans = max(1, len(ok))
+    served = stub.stats.to_dict()
+    task_names = sorted({name for run in ok for name in run["tasks"]})
+    return {
+        "concurrency": concurrency,
+        "plans": len(runs),
+        "failures": len(runs) - len(ok),
+        "errors": sorted({run["error"] for run in runs if not run["ok"]}),
+        "e2e_p50": percentile([run["elapsed"] for run in ok], 50),
+        "e2e_p95": percentile([run["elapsed"] for run in ok], 95),
+        "task_p50": {name: percentile([run["tasks"].get(name) for run in ok], 50) for name in task_names},
+        "context_tokens_before": {
+            name: percentile([run["context_tokens"].get(name, {}).get("tokens_before") for run in ok], 50)
+            for name in task_names
+        },
+        "context_tokens_after": {
+            name: percentile([run["context_tokens"].get(name, {}).get("tokens_after") for run in ok], 50)
+            for name in task_names
+        },
+        "llm_calls_per_plan": served["llm_calls"] / plans,
+        "prompt_tokens_per_plan": served["prompt_tokens"] / plans,
+        "completion_tokens_per_plan": served["completion_tokens"] / plans,
+        "search_calls_per_plan": served["search_calls"] / plans,
+        "scrape_calls_per_plan": served["scrape_calls"] / plans,
+        "tool_calls_per_plan": sum(run["tool_calls"] for run in ok) / plans,
+        "throughput_plans_per_s": len(ok) / wall if wall else None,
+    }
+
+
+def run_benchmark(concurrency_levels=(1,), repeats=1, llm_latency=0.05, search_latency=0.02,
+                  scrape_latency=0.02, warm=False):
+    """Run the benchmark at each concurrency level and return the results as a dict"""
+    from bench_stubs import StubServer
+    from model_router import model_router
+    from rate_limiter import governor
+
+    with StubServer(llm_latency, search_latency, scrape_latency) as stub:
+        configure_environment(stub, warm)
+        levels = [run_level(stub, concurrency, repeats) for concurrency in concurrency_levels]
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "concurrency_levels": list(concurrency_levels),
+            "repeats": repeats,
+            "llm_latency": llm_latency,
+            "search_latency": search_latency,
+            "scrape_latency": scrape_latency,
+            "warm": warm,
+        },
+        "levels": levels,
+        "model_routing": model_router().stats(),
+        "outbound": governor().stats(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _flatten(results):
+    metrics = {"peak_rss_mb": results.get("peak_rss_mb")}
+    for level in results.get("levels", []):
+        prefix = f"c{level['concurrency']}."
+        for name, value in level.items():
+            if isinstance(value, dict):
+                for sub_name, sub_value in value.items():
+                    metrics[f"{prefix}{name}.{sub_name}"] = sub_value
+            elif isinstance(value, (int, float)) and name != "concurrency":
+                metrics[prefix + name] = value
+    return metrics
+
+
+def compare(results, baseline, tolerance=0.15):
+    """
+    Return a list of regressions of results against baseline: metrics more than
+    tolerance worse than the baseline value (relative, or absolute where the
+    baseline is 0), any increase in failures, and metrics the baseline had that
+    are now missing (e.g. latencies when every plan failed).
+    """
+    current, previous = _flatten(results), _flatten(baseline)
+    regressions = []
+    for name, old in previous.items():
+        if old is None:
+            continue
+        new = current.get(name)
+        if new is None:
+            regressions.append({"metric": name, "baseline": old, "current": None, "change": None})
+            continue
+        key = name.rsplit(".", 1)[-1]
+        delta = -(new - old) if key in HIGHER_IS_BETTER else new - old
+        change = (new - old) / abs(old) if old else None
+        if key == "failures":
+            worse = delta > 0
+        elif old == 0:
+            worse = delta > tolerance
+        else:
+            worse = delta / abs(old) > tolerance
+        if worse:
+            regressions.append({"metric": name, "baseline": old, "current": new, "change": change})
+    return regressions
+
+
+def format_regression(regression):
+    """Return a one-line description of a regression from compare()"""
+    if regression["current"] is None:
+        return f"❌ {regression['metric']}: {regression['baseline']:.4g} → missing"
+    change = f" ({regression['change']:+.0%})" if regression["change"] is not None else ""
+    return f"❌ {regression['metric']}: {regression['baseline']:.4g} → {regression['current']:.4g}{change}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the planning pipeline against local stubs")
+    parser.add_argument("-c", "--concurrency", default="1", help="comma separated concurrent plan counts, e.g. 1,4,8")
+    parser.add_argument("-r", "--repeats", type=int, default=1, help="rounds per concurrency level")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="stub LLM latency in seconds")
+    parser.add_argument("--search-latency", type=float, default=0.02, help="stub search latency in seconds")
+    parser.add_argument("--scrape-latency", type=float, default=0.02, help="stub page latency in seconds")
+    parser.add_argument("--warm", action="store_true", help="keep the normal caches instead of starting cold")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="where to write the results")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline results JSON to check for regressions")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.15,
+        help="relative change allowed before flagging (absolute where the baseline is 0)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(
+        [int(c) for c in args.concurrency.split(",")],
+        args.repeats,
+        args.llm_latency,
+        args.search_latency,
+        args.scrape_latency,
+        args.warm,
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(format_regression(regression), file=sys.stderr)
+        if regressions:
+            return 1
+        print("✅ No regressions against baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
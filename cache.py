@@ -0,0 +1,236 @@
+# Local SQLite-backed cache used to avoid repeating expensive tool calls across runs
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urldefrag
+
+DEFAULT_CACHE_DIR = ".cache"
+
+_DEFAULT = object()
+
+
+def cache_dir():
+    """Return the directory used for on-disk caches, creating it if needed"""
+    path = os.getenv("EVENT_PLANNER_CACHE_DIR", DEFAULT_CACHE_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_path(filename):
+    """Return the full path of a cache file inside the cache directory"""
+    return os.path.join(cache_dir(), filename)
+
+
+def make_key(*parts):
+    """Return a stable hash for the given JSON-serializable key parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def normalize_url(url):
+    """Strip the fragment and surrounding whitespace so equivalent URLs share an entry"""
+    return urldefrag(str(url or "").strip())[0]
+
+
+class SQLiteCache:
+    """
+    Key/value cache stored in a SQLite table.
+    Entries carry an optional TTL, the table is capped at max_entries with
+    least-recently-used eviction, and hits/misses are counted per instance.
+    Values must be JSON-serializable; set compress=True to zlib the stored payload.
+    """
+
+    def __init__(self, path, table="cache", ttl=None, max_entries=1000, compress=False):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table} (last_access)"
+            )
+
+    def _encode(self, value):
+        data = json.dumps(value, default=str).encode("utf-8")
+        return zlib.compress(data) if self.compress else data
+
+    def _decode(self, data):
+        data = bytes(data)
+        if self.compress:
+            data = zlib.decompress(data)
+        return json.loads(data.decode("utf-8"))
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if it is missing or expired"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            if row[1] is not None and row[1] <= now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.misses += 1
+                return default
+            self._conn.execute(
+                f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+        return self._decode(row[0])
+
+    def get_entry(self, key, count=False):
+        """
+        Return the raw entry for key, including expired ones, as a dict with
+        value, created_at, expires_at and fresh. Expired entries are kept so callers
+        can revalidate them; with count=True a fresh entry counts as a hit and
+        anything else as a miss.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            fresh = row is not None and (row[2] is None or row[2] > time.time())
+            if count:
+                if fresh:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        if row is None:
+            return None
+        return {
+            "value": self._decode(row[0]),
+            "created_at": row[1],
+            "expires_at": row[2],
+            "fresh": fresh,
+        }
+
+    def set(self, key, value, ttl=_DEFAULT):
+        """Store value under key, using the cache's default TTL unless one is given"""
+        ttl = self.ttl if ttl is _DEFAULT else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} "
+                "(key, value, created_at, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, self._encode(value), now, expires_at, now),
+            )
+            self._evict()
+
+    def touch(self, key, ttl=_DEFAULT):
+        """Extend the lifetime of an existing entry without rewriting its value"""
+        ttl = self.ttl if ttl is _DEFAULT else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE {self.table} SET expires_at = ?, last_access = ? WHERE key = ?",
+                (expires_at, now, key),
+            )
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+        self.hits = 0
+        self.misses = 0
+
+    def purge_expired(self):
+        """Delete all expired entries and return how many were removed"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+        return cursor.rowcount
+
+    def _evict(self):
+        # Caller holds the lock; drop least-recently-used rows above the size cap
+        if not self.max_entries:
+            return
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+        }
+
+
+class _InFlightCall:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution whose result is shared"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Run fn for key unless another thread already is, in which case wait for its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _InFlightCall()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
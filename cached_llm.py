@@ -0,0 +1,108 @@
+# CrewAI LLM backed by the local completion cache
+import threading
+import time
+
+from crewai import LLM
+
+from cassette import active_cassette
+from llm_cache import cache_enabled, completion_cache, normalize_messages
+from model_router import check_deadline, model_base_url, model_router
+from page_reducer import count_tokens
+from tracing import estimate_cost, tracer
+
+
+class CachedLLM(LLM):
+    """LLM whose plain-text completions are served from the local completion cache"""
+
+    CACHE_KEY_PARAMS = ("temperature", "top_p", "max_tokens", "stop", "response_format", "seed")
+
+    def __init__(self, *args, agent_role="", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.agent_role = agent_role
+
+    def _cache_params(self):
+        return {name: getattr(self, name, None) for name in self.CACHE_KEY_PARAMS}
+
+    def call(self, messages, *args, **kwargs):
+        with tracer().span("llm", stage="llm", model=self.model, agent=self.agent_role) as span:
+            try:
+                response = self._call(span, messages, *args, **kwargs)
+            except Exception:
+                model_router().record(self.model, span.duration, ok=False)
+                raise
+            if not span.attributes.get("cache_hit"):
+                # Cache hits say nothing about the model's latency
+                model_router().record(self.model, span.duration)
+            tokens_in = count_tokens("\n".join(content for _, content in normalize_messages(messages)))
+            tokens_out = count_tokens(response) if isinstance(response, str) else 0
+            span.set(
+                tokens_in=tokens_in,
+                tokens_out=tokens_out,
+                cost_usd=0.0 if span.attributes.get("cache_hit") else estimate_cost(self.model, tokens_in, tokens_out),
+            )
+            return response
+
+    def _call(self, span, messages, *args, **kwargs):
+        cassette = active_cassette()
+        if cassette is not None:
+            # Recording and replay must see every call, so the cache is bypassed
+            return cassette.call(
+                "llm",
+                {"model": self.model, "params": self._cache_params(), "messages": normalize_messages(messages)},
+                lambda: super(CachedLLM, self).call(messages, *args, **kwargs),
+            )
+
+        tools = kwargs.get("tools", args[0] if args else None)
+        # Native tool calls have side effects, so only plain completions are cached
+        if tools or not cache_enabled():
+            return super().call(messages, *args, **kwargs)
+
+        cache = completion_cache()
+        params = self._cache_params()
+        cached = cache.lookup(self.model, params, messages, agent=self.agent_role)
+        span.set(cache_hit=cached is not None)
+        if cached is not None:
+            return cached
+
+        started = time.monotonic()
+        response = super().call(messages, *args, **kwargs)
+        if isinstance(response, str) and response:
+            cache.store(self.model, params, messages, response, time.monotonic() - started)
+        return response
+
+
+class RoutedLLM(CachedLLM):
+    """
+    LLM that sends each call to the model the router picks for the current task and
+    agent, falling back to the next candidate model when a call fails.
+    """
+
+    def __init__(self, *args, agent_role="", **kwargs):
+        super().__init__(*args, agent_role=agent_role, **kwargs)
+        self._llm_kwargs = {name: value for name, value in kwargs.items() if name not in ("model", "base_url")}
+        self._llms = {self.model: self}
+        # Pooled instances are shared by concurrent runs
+        self._llms_lock = threading.Lock()
+
+    def _llm_for(self, model):
+        with self._llms_lock:
+            if model not in self._llms:
+                self._llms[model] = CachedLLM(
+                    model=model, base_url=model_base_url(model), agent_role=self.agent_role, **self._llm_kwargs
+                )
+            return self._llms[model]
+
+    def call(self, messages, *args, **kwargs):
+        models = model_router().plan(self.agent_role)
+        for attempt, model in enumerate(models):
+            # A task past its budget (or a cancelled run) stops here rather than starting another call
+            check_deadline()
+            llm = self._llm_for(model)
+            try:
+                if llm is self:
+                    return super().call(messages, *args, **kwargs)
+                return llm.call(messages, *args, **kwargs)
+            except Exception:
+                if attempt == len(models) - 1:
+                    raise
+                model_router().record_fallback(model)
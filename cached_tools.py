@@ -0,0 +1,225 @@
+# CrewAI tools backed by the local on-disk cache
+import os
+import re
+import threading
+from urllib.parse import urlsplit
+
+from crewai_tools import ScrapeWebsiteTool, SerperDevTool
+
+from artifacts import VENUE_TASK
+from cache import SingleFlight, SQLiteCache, cache_path, make_key, normalize_url
+from cassette import active_cassette
+from model_router import check_deadline, current_task
+from page_reducer import DEFAULT_TOKEN_BUDGET, reduce_html
+from rate_limiter import governor
+from resource_pool import http_session, resource_pool
+from tracing import current_span, tracer
+from venue_catalog import current_event, venue_catalog
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+_scrape_cache = None
+_scrape_cache_lock = threading.Lock()
+_scrape_flight = SingleFlight()
+
+
+def search_cache():
+    """Return the process-wide cache for search results"""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SQLiteCache(
+                cache_path("search.sqlite3"),
+                table="search_results",
+                ttl=float(os.getenv("SEARCH_CACHE_TTL", 24 * 60 * 60)),
+                max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 5000)),
+            )
+        return _search_cache
+
+
+def scrape_cache():
+    """Return the process-wide cache of compressed page bodies keyed by URL"""
+    global _scrape_cache
+    with _scrape_cache_lock:
+        if _scrape_cache is None:
+            _scrape_cache = SQLiteCache(
+                cache_path("scrape.sqlite3"),
+                table="scraped_pages",
+                # Once an entry expires it is revalidated with the origin rather than refetched
+                ttl=float(os.getenv("SCRAPE_CACHE_TTL", 6 * 60 * 60)),
+                max_entries=int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", 2000)),
+                compress=True,
+            )
+        return _scrape_cache
+
+
+def normalize_query(query):
+    """Lowercase a search query and collapse its whitespace"""
+    return " ".join(str(query or "").lower().split())
+
+
+def search_cache_key(query, locale="", search_type="search", n_results=10):
+    """Return the cache key for a search, ignoring case and spacing differences"""
+    return make_key("search", normalize_query(query), (locale or "").lower(), search_type, n_results)
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool that serves repeated queries from the local search cache"""
+
+    def _run(self, **kwargs):
+        search_query = kwargs.get("search_query") or kwargs.get("query")
+        check_deadline()
+        with tracer().span("tool", stage="tool:search", tool="search", query=normalize_query(search_query)):
+            return self._search(search_query, **kwargs)
+
+    def _search(self, search_query, **kwargs):
+        cassette = active_cassette()
+        if cassette is not None:
+            # Recording and replay must see every call, so the cache is bypassed
+            return cassette.call(
+                "search",
+                {"query": normalize_query(search_query), "kwargs": kwargs},
+                lambda: self._governed_search(**kwargs),
+            )
+
+        key = search_cache_key(
+            search_query,
+            kwargs.get("locale") or getattr(self, "locale", None) or "",
+            getattr(self, "search_type", "search"),
+            getattr(self, "n_results", 10),
+        )
+        cache = search_cache()
+        cached = cache.get(key)
+        current_span().set(cache_hit=cached is not None)
+        if cached is not None:
+            return cached
+
+        result = self._governed_search(**kwargs)
+        if result:
+            cache.set(key, result)
+        return result
+
+    def _governed_search(self, **kwargs):
+        host = urlsplit(getattr(self, "base_url", None) or "https://google.serper.dev").netloc
+        return governor().call("search", host, lambda: super(CachedSerperDevTool, self)._run(**kwargs))
+
+
+def fetch_page(url, headers=None, cookies=None, timeout=15):
+    """
+    Return the HTML body of url, served from the scrape cache when possible.
+    Fresh entries are returned without a request; stale ones are revalidated
+    with If-None-Match / If-Modified-Since and only re-downloaded when changed.
+    Concurrent fetches of the same URL share a single request.
+    """
+    url = normalize_url(url)
+
+    cassette = active_cassette()
+    if cassette is not None:
+        return cassette.call("scrape", {"url": url}, lambda: _download(url, headers, cookies, timeout).text)
+
+    key = make_key("scrape", url)
+    cache = scrape_cache()
+
+    entry = cache.get_entry(key, count=True)
+    span = current_span()
+    if span is not None:
+        span.set(cache_hit=entry is not None and entry["fresh"])
+    if entry is not None and entry["fresh"]:
+        return entry["value"]["html"]
+
+    return _scrape_flight.do(key, lambda: _fetch_and_store(url, key, headers, cookies, timeout))
+
+
+def _download(url, headers, cookies, timeout):
+    import requests
+
+    def get():
+        try:
+            response = http_session().get(url, headers=headers, cookies=cookies, timeout=timeout)
+        except requests.ConnectionError:
+            # The pooled connections may have gone bad; start the next fetch on a fresh session
+            resource_pool().invalidate("http_session")
+            raise
+        if response.status_code != 304:
+            response.raise_for_status()
+            response.encoding = response.apparent_encoding
+        return response
+
+    # Venue sites are rate limited and capped per host, and transient failures retried
+    return governor().call("scrape", urlsplit(url).netloc, get)
+
+
+def _fetch_and_store(url, key, headers, cookies, timeout):
+    cache = scrape_cache()
+    entry = cache.get_entry(key)
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry["value"].get("etag"):
+            request_headers["If-None-Match"] = entry["value"]["etag"]
+        if entry["value"].get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["value"]["last_modified"]
+
+    response = _download(url, request_headers, cookies, timeout)
+    if response.status_code == 304 and entry is not None:
+        cache.touch(key)
+        return entry["value"]["html"]
+
+    html = response.text
+    cache.set(key, {
+        "html": html,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    })
+    return html
+
+
+def html_to_text(html):
+    """Convert a page body to text the same way ScrapeWebsiteTool does"""
+    from bs4 import BeautifulSoup
+
+    text = "The following text is scraped website content:\n\n"
+    text += BeautifulSoup(html, "html.parser").get_text(" ")
+    text = re.sub("[ \t]+", " ", text)
+    text = re.sub("\\s+\n\\s+", "\n", text)
+    return text
+
+
+class CachedScrapeWebsiteTool(ScrapeWebsiteTool):
+    """
+    ScrapeWebsiteTool that keeps compressed page bodies on disk and revalidates them.
+    Unless reduce_content is disabled, pages are cut down to their venue-relevant
+    sections within token_budget before they reach the agent.
+    """
+
+    reduce_content: bool = True
+    token_budget: int = int(os.getenv("SCRAPE_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+
+    def _run(self, **kwargs):
+        website_url = kwargs.get("website_url", self.website_url)
+        check_deadline()
+        with tracer().span("tool", stage="tool:scrape", tool="scrape", url=normalize_url(website_url)):
+            return self._scrape(website_url)
+
+    def _scrape(self, website_url):
+        html = fetch_page(
+            website_url,
+            headers=getattr(self, "headers", None),
+            cookies=getattr(self, "cookies", None),
+        )
+        if not self.reduce_content:
+            return html_to_text(html)
+
+        reduced = reduce_html(html, token_budget=self.token_budget, source=website_url)
+        current_span().set(tokens_saved=reduced["tokens_saved"])
+        event_details = current_event()
+        # Only the venue task scrapes venue pages; caterer or promo pages would pollute the catalog
+        if event_details is not None and current_task() == VENUE_TASK:
+            title = re.search(r"<title[^>]*>(.*?)</title>", html, re.IGNORECASE | re.DOTALL)
+            venue_catalog().add_page(
+                website_url, " ".join(title.group(1).split()) if title else "", reduced["text"], event_details
+            )
+        return (
+            "The following text is the relevant content scraped from the website:\n\n"
+            + reduced["text"]
+        )
@@ -0,0 +1,104 @@
+# Record/replay of LLM, search and scrape traffic for offline, reproducible runs
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+from cache import make_key
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a call was never recorded"""
+
+
+class Cassette:
+    """
+    JSONL file of recorded interactions, each with a kind ("llm", "search", "scrape"),
+    a key derived from the request, the response and the original latency.
+    In record mode every call goes through and is appended as it completes; in replay
+    mode calls are answered from the file by key, in recorded order for repeated
+    requests, after sleeping latency_scale times the recorded latency.
+    """
+
+    def __init__(self, path, mode=REPLAY, latency_scale=0.0):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._interactions = defaultdict(deque)
+        self.recorded = 0
+        self.replayed = 0
+        if mode == REPLAY:
+            self._load()
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    self._interactions[(interaction["kind"], interaction["key"])].append(interaction)
+
+    def call(self, kind, request, fn):
+        """Return fn()'s result, recording it or serving the recorded one depending on mode"""
+        key = make_key(kind, request)
+        if self.mode == REPLAY:
+            return self._replay(kind, key, request)
+
+        started = time.monotonic()
+        response = fn()
+        interaction = {
+            "kind": kind,
+            "key": key,
+            "request": request,
+            "response": response,
+            "latency": time.monotonic() - started,
+        }
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(interaction, default=str) + "\n")
+            self.recorded += 1
+        return response
+
+    def _replay(self, kind, key, request):
+        with self._lock:
+            queue = self._interactions.get((kind, key))
+            if not queue:
+                raise CassetteMiss(f"No recorded {kind} call for {json.dumps(request, default=str)[:200]}")
+            # Keep the last response around so extra identical calls still replay
+            interaction = queue.popleft() if len(queue) > 1 else queue[0]
+            self.replayed += 1
+        if self.latency_scale:
+            time.sleep(interaction["latency"] * self.latency_scale)
+        return interaction["response"]
+
+
+_cassette = None
+_cassette_config = None
+_cassette_lock = threading.Lock()
+
+
+def active_cassette():
+    """
+    Return the cassette configured through EVENT_PLANNER_CASSETTE and
+    EVENT_PLANNER_CASSETTE_MODE, or None when recording/replay is off.
+    """
+    global _cassette, _cassette_config
+    path = os.getenv("EVENT_PLANNER_CASSETTE")
+    if not path:
+        return None
+    config = (
+        path,
+        os.getenv("EVENT_PLANNER_CASSETTE_MODE", REPLAY),
+        float(os.getenv("EVENT_PLANNER_REPLAY_LATENCY_SCALE", 0)),
+    )
+    with _cassette_lock:
+        if _cassette is None or _cassette_config != config:
+            _cassette = Cassette(*config)
+            _cassette_config = config
+        return _cassette
@@ -0,0 +1,128 @@
+# Durable per-task checkpoints of crew runs, so an interrupted run can resume where it stopped
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from cache import cache_path
+
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def _unpack(data):
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+class CheckpointStore:
+    """
+    SQLite table of finished task outputs keyed by run ID and task name, with the
+    run's event details, written as each task finishes and before any task that
+    depends on it starts. A run's checkpoints are discarded once it completes,
+    so whatever is left belongs to runs that timed out, failed or died.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    run_id TEXT NOT NULL,
+                    task_name TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    event_details BLOB NOT NULL,
+                    output BLOB NOT NULL,
+                    PRIMARY KEY (run_id, task_name)
+                );
+                CREATE INDEX IF NOT EXISTS checkpoints_created_at ON checkpoints (created_at);
+            """)
+
+    def save(self, run_id, event_details, task_name, output):
+        """Durably record one finished task output (a TaskOutput or StoredTaskOutput)"""
+        stored = {
+            "name": task_name,
+            "description": getattr(output, "description", ""),
+            "agent": str(getattr(output, "agent", "")),
+            "raw": output.raw,
+            "json_dict": getattr(output, "json_dict", None),
+        }
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, task_name, created_at, event_details, output) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, task_name, time.time(), _pack(event_details), _pack(stored)),
+            )
+
+    def load(self, run_id):
+        """Return (event_details, {task name: StoredTaskOutput}) saved for run_id, or None"""
+        from scheduler import StoredTaskOutput
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT event_details, output FROM checkpoints WHERE run_id = ? ORDER BY created_at", (run_id,)
+            ).fetchall()
+        if not rows:
+            return None
+        outputs = {}
+        for row in rows:
+            stored = _unpack(row["output"])
+            outputs[stored["name"]] = StoredTaskOutput(
+                stored["name"], stored["description"], stored["agent"], stored["raw"], stored["json_dict"],
+            )
+        return _unpack(rows[-1]["event_details"]), outputs
+
+    def discard(self, run_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+
+    def interrupted_runs(self, limit=20):
+        """Return [{run_id, event_details, tasks, updated_at}] of runs with checkpoints left, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, GROUP_CONCAT(task_name) AS tasks, MAX(created_at) AS updated_at "
+                "FROM checkpoints GROUP BY run_id ORDER BY updated_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+            details = {
+                row["run_id"]: self._conn.execute(
+                    "SELECT event_details FROM checkpoints WHERE run_id = ? LIMIT 1", (row["run_id"],)
+                ).fetchone()[0]
+                for row in rows
+            }
+        return [
+            {
+                "run_id": row["run_id"],
+                "event_details": _unpack(details[row["run_id"]]),
+                "tasks": row["tasks"].split(","),
+                "updated_at": row["updated_at"],
+            }
+            for row in rows
+        ]
+
+    def prune(self, max_age):
+        """Drop checkpoints older than max_age seconds"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE created_at < ?", (time.time() - max_age,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def checkpoint_store():
+    """Return the process-wide checkpoint store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CheckpointStore(cache_path("checkpoints.sqlite3"))
+            _store.prune(float(os.getenv("CHECKPOINT_MAX_AGE", DEFAULT_MAX_AGE)))
+        return _store
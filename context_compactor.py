@@ -0,0 +1,171 @@
+# Compacts upstream task outputs before they are handed to downstream tasks as context
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter
+
+from page_reducer import count_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_TOKEN_BUDGET = 600
+
+# Same separator CrewAI uses when it joins context outputs for a task
+CONTEXT_SEPARATOR = "\n\n----------\n\n"
+
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "will", "have", "are", "was",
+    "were", "been", "their", "they", "them", "into", "also", "which", "while", "there",
+    "these", "those", "other", "such", "each", "more", "most", "some", "than", "then",
+    "about", "over", "only", "your", "our", "can", "all", "any", "its", "has", "had",
+}
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(*\-])")
+
+_stats_lock = threading.Lock()
+_stats = {"contexts": 0, "tokens_before": 0, "tokens_after": 0}
+
+
+def context_token_budget():
+    """Return the per-output token budget from CONTEXT_TOKEN_BUDGET; 0 turns compaction off"""
+    return int(os.getenv("CONTEXT_TOKEN_BUDGET", DEFAULT_CONTEXT_TOKEN_BUDGET))
+
+
+def structured_fields(output):
+    """Return the output's structured fields (output_json / output_pydantic), or None"""
+    if getattr(output, "json_dict", None):
+        return output.json_dict
+    pydantic = getattr(output, "pydantic", None)
+    if pydantic is not None and hasattr(pydantic, "model_dump"):
+        return pydantic.model_dump()
+    return None
+
+
+def _units(text):
+    """Split text into (kind, content) units: headings, list items and sentences, in order"""
+    units = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            units.append(("heading", line))
+        elif re.match(r"^([-*+]|\d+[.)])\s", line):
+            units.append(("item", line))
+        else:
+            units.extend(("sentence", sentence) for sentence in _SENTENCE_END.split(line) if sentence)
+    return units
+
+
+def _words(text):
+    return [word for word in re.findall(r"[a-z0-9$€£]+", text.lower()) if len(word) > 2 and word not in STOPWORDS]
+
+
+def summarize_text(text, token_budget):
+    """
+    Extractive summary of text within token_budget: the sentences and list items
+    carrying the most frequent content words (and any figures) are kept, in their
+    original order, together with the headings they sit under.
+    """
+    if count_tokens(text) <= token_budget:
+        return text
+    units = _units(text)
+    frequencies = Counter(word for kind, content in units if kind != "heading" for word in _words(content))
+
+    scored = []
+    for position, (kind, content) in enumerate(units):
+        if kind == "heading":
+            continue
+        words = _words(content)
+        if not words:
+            continue
+        score = sum(frequencies[word] for word in set(words)) / len(words) ** 0.5
+        # Counts, dates and prices are what downstream agents most often need
+        if re.search(r"\d", content):
+            score *= 1.5
+        scored.append((score, position))
+
+    kept = set()
+    kept_words = []
+    used = 0
+    for _, position in sorted(scored, reverse=True):
+        tokens = count_tokens(units[position][1]) + 1
+        if used + tokens > token_budget:
+            continue
+        # Skip near-repeats of something already kept
+        words = set(_words(units[position][1]))
+        if any(len(words & other) >= 0.8 * len(words | other) for other in kept_words):
+            continue
+        kept.add(position)
+        kept_words.append(words)
+        used += tokens
+
+    lines = []
+    heading = None
+    for position, (kind, content) in enumerate(units):
+        if kind == "heading":
+            heading = content
+        elif position in kept:
+            if heading is not None:
+                lines.append(heading)
+                heading = None
+            lines.append(content)
+    summary = "\n".join(lines)
+    # Headings are added back on top of the selected units; trim if that overshoots
+    while lines and count_tokens(summary) > token_budget:
+        lines.pop()
+        summary = "\n".join(lines)
+    return summary
+
+
+def compact_output(output, token_budget):
+    """Return the text of one upstream output to pass on as context"""
+    fields = structured_fields(output)
+    if fields is not None:
+        # Structured results are passed on verbatim, just without the formatting whitespace
+        return json.dumps(fields, ensure_ascii=False, separators=(",", ":"))
+    raw = getattr(output, "raw", "") or ""
+    if not token_budget:
+        return raw
+    return summarize_text(raw, token_budget)
+
+
+def compact_context(task, outputs_by_task, token_budget=None):
+    """
+    Build the context for task from its context tasks' outputs, each compacted to
+    token_budget. Returns a dict with the context text and its token counts before
+    (the raw outputs joined, as CrewAI would pass them) and after compaction.
+    """
+    outputs = [outputs_by_task[id(dep)] for dep in (getattr(task, "context", None) or [])]
+    raw = CONTEXT_SEPARATOR.join(output.raw for output in outputs if output.raw)
+    if token_budget is None:
+        text = raw
+    else:
+        text = CONTEXT_SEPARATOR.join(
+            part for part in (compact_output(output, token_budget) for output in outputs) if part
+        )
+    report = {
+        "text": text,
+        "tokens_before": count_tokens(raw) if raw else 0,
+        "tokens_after": count_tokens(text) if text else 0,
+    }
+    if outputs:
+        with _stats_lock:
+            _stats["contexts"] += 1
+            _stats["tokens_before"] += report["tokens_before"]
+            _stats["tokens_after"] += report["tokens_after"]
+        logger.info(
+            "Context for %s compacted from %d to %d tokens",
+            getattr(task, "name", None) or "task", report["tokens_before"], report["tokens_after"],
+        )
+    return report
+
+
+def compaction_stats():
+    """Return the cumulative context token counts across all compactions in this process"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["tokens_saved"] = max(0, stats["tokens_before"] - stats["tokens_after"])
+    return stats
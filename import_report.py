@@ -0,0 +1,130 @@
+# Import-time report for the app's startup path, measured with python -X importtime in a fresh interpreter
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+# Loaded on first real use (or by the background pre-warm), never before first paint
+HEAVY_MODULES = ["crewai", "crewai_tools", "litellm", "openai"]
+
+
+def startup_modules(script=APP_SCRIPT):
+    """Return the modules script imports at its top level, i.e. before the first page renders"""
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        modules.extend(name for name in names if name not in modules)
+    return modules
+
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(output):
+    """
+    Parse -X importtime stderr into a list of {module, self_ms, cumulative_ms, depth},
+    in the order the imports finished.
+    """
+    rows = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                "module": module,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                # -X importtime indents nested imports by two spaces per level
+                "depth": (len(indent) - 1) // 2,
+            })
+    return rows
+
+
+def import_report(modules, python=None, cwd=None):
+    """
+    Import modules one after another in a fresh interpreter and return
+    {"modules": [{module, cumulative_ms, loaded}], "rows": all parsed rows,
+    "total_ms": cumulative cost of everything imported}. A module already loaded
+    by an earlier one in the list costs nothing extra, as in the real app.
+    """
+    code = "\n".join(
+        f"try:\n    import {module}\nexcept Exception as e:\n    print('{module}', repr(e))"
+        for module in modules
+    )
+    completed = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=cwd or os.path.dirname(APP_SCRIPT),
+    )
+    rows = parse_importtime(completed.stderr)
+    failed = {line.split(" ", 1)[0] for line in completed.stdout.splitlines() if line.strip()}
+    top_level = {row["module"]: row for row in rows if row["depth"] == 0}
+    return {
+        "modules": [
+            {
+                "module": module,
+                "cumulative_ms": top_level[module]["cumulative_ms"] if module in top_level else 0.0,
+                "loaded": module not in failed,
+            }
+            for module in modules
+        ],
+        "rows": rows,
+        "total_ms": sum(row["cumulative_ms"] for row in rows if row["depth"] == 0),
+    }
+
+
+def heaviest(rows, limit=15):
+    """Return the modules with the highest cumulative import cost"""
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:limit]
+
+
+def loaded_heavy_modules(modules, python=None):
+    """Return the HEAVY_MODULES that importing modules pulls in, which should be none"""
+    code = "\n".join(f"import {module}" for module in modules) + (
+        f"\nimport sys\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [python or sys.executable, "-c", code],
+        capture_output=True, text=True, cwd=os.path.dirname(APP_SCRIPT),
+    )
+    return completed.stdout.split()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report per-module import cost of the app's startup path")
+    parser.add_argument("modules", nargs="*", help="modules to import, in order (default: app.py's startup imports)")
+    parser.add_argument("-n", "--top", type=int, default=15, help="how many of the heaviest modules to list")
+    parser.add_argument("--budget-ms", type=float, help="fail if the total import time exceeds this")
+    args = parser.parse_args(argv)
+
+    modules = args.modules or startup_modules()
+    report = import_report(modules)
+    for module in report["modules"]:
+        status = "" if module["loaded"] else "  (not installed)"
+        print(f"{module['cumulative_ms']:9.1f} ms  {module['module']}{status}")
+    print(f"{report['total_ms']:9.1f} ms  total\n\nHeaviest imports (cumulative):")
+    for row in heaviest(report["rows"], args.top):
+        print(f"{row['cumulative_ms']:9.1f} ms  {'  ' * row['depth']}{row['module']}")
+
+    failed = False
+    heavy = loaded_heavy_modules([module["module"] for module in report["modules"] if module["loaded"]])
+    if heavy:
+        print(f"\n❌ Startup path imports heavy modules: {', '.join(heavy)}", file=sys.stderr)
+        failed = True
+    if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+        print(f"\n❌ Import time {report['total_ms']:.0f} ms is over the {args.budget_ms:.0f} ms budget", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
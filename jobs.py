@@ -0,0 +1,167 @@
+# Background job execution so long crew runs don't block the Streamlit script thread
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Finished jobs are kept this long so a session can pick up its result after reruns
+RESULT_TTL = 60 * 60
+
+
+class Job:
+    """State of one submitted job"""
+
+    def __init__(self, job_id, description="", progress=None, run_id=None):
+        self.id = job_id
+        self.description = description
+        self.progress = progress
+        # The planning run the job works on, if any
+        self.run_id = run_id
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Set to ask a cancellable job to stop
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobManager:
+    """
+    Runs submitted callables on a bounded worker pool and keeps their results.
+    max_workers is the global concurrency limit; jobs beyond it wait in FIFO order.
+    """
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="plan-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, description="", progress=None, cancellable=False, run_id=None, **kwargs):
+        """
+        Queue fn(*args, **kwargs) and return the new job's ID.
+        progress is kept on the job so pollers can read live progress from it.
+        With cancellable, fn also gets the job's cancel_event, which it should
+        watch and stop (by raising) once set. A run_id is recorded on the job
+        (see active_run_ids()) and passed on to fn.
+        """
+        job = Job(uuid.uuid4().hex, description, progress, run_id)
+        if run_id is not None:
+            kwargs["run_id"] = run_id
+        if cancellable:
+            kwargs["cancel_event"] = job.cancel_event
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        with self._lock:
+            if job.status == CANCELLED:
+                # Cancelled while queued
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                job.error = e
+                job.status = CANCELLED if job.cancel_event.is_set() else FAILED
+                job.finished_at = time.time()
+            return
+        with self._lock:
+            job.result = result
+            job.status = DONE
+            job.finished_at = time.time()
+
+    def cancel(self, job_id):
+        """
+        Ask a job to stop. A queued job is dropped at once; a running one is
+        told through its cancel_event and ends as CANCELLED when fn gives up.
+        Returns False if the job is unknown or already finished.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.cancel_event.set()
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished_at = time.time()
+            return True
+
+    def get(self, job_id):
+        """Return the job with job_id, or None if it is unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job_id):
+        """Return the 1-based position of a queued job, or 0 once it has started"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return 0
+            queued = sorted(
+                (j for j in self._jobs.values() if j.status == QUEUED),
+                key=lambda j: j.submitted_at,
+            )
+            return queued.index(job) + 1
+
+    def active_run_ids(self):
+        """Return the run IDs of jobs that are queued or running"""
+        with self._lock:
+            return {job.run_id for job in self._jobs.values() if not job.finished and job.run_id is not None}
+
+    def stats(self):
+        """Return job counts by status"""
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        counts["max_workers"] = self.max_workers
+        return counts
+
+    def forget(self, job_id):
+        """Drop a job's record once its result has been collected"""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _prune(self):
+        # Caller holds the lock
+        cutoff = time.time() - RESULT_TTL
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def job_manager():
+    """Return the process-wide job manager shared by every Streamlit session"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(max_workers=int(os.getenv("MAX_CONCURRENT_PLANS", 2)))
+        return _manager
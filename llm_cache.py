@@ -0,0 +1,194 @@
+# Local completion cache in front of the agents' LLM calls
+import hashlib
+import os
+import re
+import struct
+import threading
+
+from cache import SQLiteCache, cache_path, make_key
+
+# MinHash / LSH parameters for near-duplicate prompt matching
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _permutations():
+    # Fixed coefficients so signatures are stable across processes
+    coefficients = []
+    for i in range(NUM_PERM):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a, b = struct.unpack("<QQ", digest)
+        coefficients.append((a % (_MERSENNE_PRIME - 1) + 1, b % _MERSENNE_PRIME))
+    return coefficients
+
+
+_PERMUTATIONS = _permutations()
+
+
+def normalize_messages(messages):
+    """Return messages as (role, whitespace-collapsed content) pairs"""
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    normalized = []
+    for message in messages:
+        content = message.get("content") or ""
+        if not isinstance(content, str):
+            content = str(content)
+        normalized.append((message.get("role", "user"), " ".join(content.split())))
+    return normalized
+
+
+def minhash_signature(text):
+    """Return the MinHash signature of the word shingles of text"""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little")
+        for s in shingles
+    ]
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimated_similarity(signature, other):
+    """Estimate the Jaccard similarity of two texts from their MinHash signatures"""
+    return sum(1 for x, y in zip(signature, other) if x == y) / NUM_PERM
+
+
+class CompletionCache:
+    """
+    Cache of LLM completions. Lookups match exactly on model, parameters and
+    normalized messages; with a near_duplicate_threshold set, prompts whose
+    estimated Jaccard similarity reaches the threshold also match, found through
+    locality-sensitive hashing bands kept next to the entries.
+    """
+
+    def __init__(self, path, ttl=None, max_entries=5000, near_duplicate_threshold=None):
+        self.entries = SQLiteCache(path, table="completions", ttl=ttl, max_entries=max_entries, compress=True)
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self._conn = self.entries._conn
+        self._lock = self.entries._lock
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completion_bands ("
+                "band INTEGER NOT NULL, bucket TEXT NOT NULL, key TEXT NOT NULL, "
+                "scope TEXT NOT NULL, PRIMARY KEY (band, bucket, key))"
+            )
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, agent, outcome, saved_seconds=0.0):
+        with self._stats_lock:
+            stats = self._stats.setdefault(agent or "unknown", {
+                "exact_hits": 0, "near_hits": 0, "misses": 0, "saved_seconds": 0.0,
+            })
+            stats[outcome] += 1
+            stats["saved_seconds"] += saved_seconds
+
+    def lookup(self, model, params, messages, agent=""):
+        """Return the cached completion for this call, or None"""
+        normalized = normalize_messages(messages)
+        scope = make_key(model, params)
+        key = make_key("completion", scope, normalized)
+
+        value = self.entries.get(key)
+        if value is not None:
+            self._record(agent, "exact_hits", value.get("latency", 0.0))
+            return value["response"]
+
+        if self.near_duplicate_threshold:
+            value = self._lookup_near_duplicate(scope, normalized)
+            if value is not None:
+                self._record(agent, "near_hits", value.get("latency", 0.0))
+                return value["response"]
+
+        self._record(agent, "misses")
+        return None
+
+    def _lookup_near_duplicate(self, scope, normalized):
+        signature = minhash_signature("\n".join(content for _, content in normalized))
+        candidates = set()
+        with self._lock:
+            for band, bucket in enumerate(self._buckets(signature)):
+                rows = self._conn.execute(
+                    "SELECT key FROM completion_bands WHERE band = ? AND bucket = ? AND scope = ?",
+                    (band, bucket, scope),
+                ).fetchall()
+                candidates.update(row[0] for row in rows)
+
+        best, best_similarity = None, self.near_duplicate_threshold
+        for key in candidates:
+            entry = self.entries.get_entry(key)
+            if entry is None or not entry["fresh"]:
+                # Evicted or expired; drop its stale band rows
+                with self._lock, self._conn:
+                    self._conn.execute("DELETE FROM completion_bands WHERE key = ?", (key,))
+                continue
+            if not entry["value"].get("signature"):
+                continue
+            similarity = estimated_similarity(signature, entry["value"]["signature"])
+            if similarity >= best_similarity:
+                best, best_similarity = entry["value"], similarity
+        return best
+
+    def _buckets(self, signature):
+        for band in range(BANDS):
+            rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+            yield hashlib.blake2b(struct.pack(f"<{ROWS_PER_BAND}Q", *rows), digest_size=8).hexdigest()
+
+    def store(self, model, params, messages, response, latency=0.0):
+        normalized = normalize_messages(messages)
+        scope = make_key(model, params)
+        key = make_key("completion", scope, normalized)
+        value = {"response": response, "latency": latency}
+
+        if self.near_duplicate_threshold:
+            signature = minhash_signature("\n".join(content for _, content in normalized))
+            value["signature"] = signature
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO completion_bands (band, bucket, key, scope) VALUES (?, ?, ?, ?)",
+                    [(band, bucket, key, scope) for band, bucket in enumerate(self._buckets(signature))],
+                )
+        self.entries.set(key, value)
+
+    def stats(self):
+        """Return per-agent hit/miss counts, hit rate and LLM seconds saved"""
+        with self._stats_lock:
+            stats = {agent: dict(values) for agent, values in self._stats.items()}
+        for values in stats.values():
+            lookups = values["exact_hits"] + values["near_hits"] + values["misses"]
+            values["hit_rate"] = (values["exact_hits"] + values["near_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+_completion_cache = None
+_completion_cache_lock = threading.Lock()
+
+
+def completion_cache():
+    """Return the process-wide completion cache"""
+    global _completion_cache
+    with _completion_cache_lock:
+        if _completion_cache is None:
+            threshold = os.getenv("LLM_CACHE_NEAR_DUP_THRESHOLD")
+            _completion_cache = CompletionCache(
+                cache_path("completions.sqlite3"),
+                ttl=float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 60 * 60)),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000)),
+                near_duplicate_threshold=float(threshold) if threshold else None,
+            )
+        return _completion_cache
+
+
+def cache_enabled():
+    return os.getenv("LLM_CACHE", "1") == "1"
@@ -0,0 +1,69 @@
+# Offline stand-ins for the search and scrape tools, used when crewai_tools is not installed
+import os
+from typing import Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from cache import normalize_url
+from cassette import active_cassette
+from page_reducer import DEFAULT_TOKEN_BUDGET, reduce_html
+
+
+class MockSearchSchema(BaseModel):
+    search_query: str = Field(..., description="Mandatory search query you want to use to search the internet")
+
+
+class MockScrapeSchema(BaseModel):
+    website_url: str = Field(..., description="Mandatory website url to read the file")
+
+
+class MockSerperDevTool(BaseTool):
+    """Search tool that replays a cassette when one is active and otherwise returns canned results"""
+
+    name: str = "Search the internet with Serper"
+    description: str = "A tool that can be used to search the internet with a search_query."
+    args_schema: Type[BaseModel] = MockSearchSchema
+
+    def _run(self, search_query: str, **kwargs) -> str:
+        cassette = active_cassette()
+        if cassette is not None:
+            return cassette.call(
+                "search",
+                {"query": " ".join(search_query.lower().split()), "kwargs": {"search_query": search_query, **kwargs}},
+                lambda: self._canned(search_query),
+            )
+        return self._canned(search_query)
+
+    def _canned(self, search_query):
+        # Deterministic results so offline runs are reproducible
+        lines = [f"Search results for: {search_query}", ""]
+        for i in range(1, 4):
+            lines += [
+                f"Title: {search_query.title()} - Result {i}",
+                f"Link: https://example.com/{'-'.join(search_query.lower().split())}/{i}",
+                f"Snippet: Simulated result {i} for '{search_query}'.",
+                "---",
+            ]
+        return "\n".join(lines)
+
+
+class MockScrapeWebsiteTool(BaseTool):
+    """Scrape tool that replays a cassette when one is active and otherwise returns a canned page"""
+
+    name: str = "Read website content"
+    description: str = "A tool that can be used to read a website content."
+    args_schema: Type[BaseModel] = MockScrapeSchema
+    token_budget: int = int(os.getenv("SCRAPE_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+
+    def _run(self, website_url: str, **kwargs) -> str:
+        cassette = active_cassette()
+        if cassette is not None:
+            # Keyed like the real scrape tool's recordings, so either tool replays the other's cassette
+            html = cassette.call("scrape", {"url": normalize_url(website_url)}, lambda: self._canned(website_url))
+            reduced = reduce_html(html, token_budget=self.token_budget, source=website_url)
+            return "The following text is the relevant content scraped from the website:\n\n" + reduced["text"]
+        return "The following text is scraped website content:\n\n" + self._canned(website_url)
+
+    def _canned(self, website_url):
+        return f"Simulated content of {website_url}. No live scraping is available in this environment."
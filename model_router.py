@@ -0,0 +1,215 @@
+# Picks the model for each LLM call from per-task / per-agent routes and observed model latency
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Routes are tried in order; a tier name resolves to the model configured for that tier
+DEFAULT_ROUTES = {
+    # The venue search-and-extract loop is many short calls, so it gets the fast model
+    "venue_task": ["fast"],
+    "catering_task": ["fast"],
+    "equipment_task": ["fast"],
+    # The marketing report is one long piece of writing, worth the stronger model
+    "marketing_task": ["strong", "fast"],
+}
+
+# Calls kept per model for the rolling latency and error rate
+WINDOW = 50
+# Below this many calls a model's error rate is not trusted yet
+MIN_SAMPLES = 3
+# A model failing more often than this is tried after the healthy ones
+MAX_ERROR_RATE = 0.5
+# Failures older than this no longer count, so a demoted model gets tried again
+ERROR_MEMORY = 300
+# How often work waiting on something checks whether its run was cancelled
+CANCEL_POLL_INTERVAL = 0.25
+
+_current_task = contextvars.ContextVar("current_task", default=None)
+_deadline = contextvars.ContextVar("deadline", default=None)
+_cancel_event = contextvars.ContextVar("cancel_event", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised inside a task whose time budget has run out or whose run was cancelled"""
+
+
+def tier_models():
+    return {
+        "fast": os.getenv("FAST_MODEL") or os.getenv("OPENAI_MODEL_NAME") or "gpt-4o-mini",
+        "strong": os.getenv("STRONG_MODEL") or "gpt-4o",
+    }
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+@contextmanager
+def task_scope(task_name, deadline=None, cancel_event=None):
+    """
+    Route LLM calls in the enclosed block for task_name, finishing by the monotonic
+    deadline; check_deadline() stops the block's work once that passes or
+    cancel_event (a threading.Event) is set.
+    """
+    task_token = _current_task.set(task_name)
+    deadline_token = _deadline.set(deadline)
+    cancel_token = _cancel_event.set(cancel_event)
+    try:
+        yield
+    finally:
+        _cancel_event.reset(cancel_token)
+        _deadline.reset(deadline_token)
+        _current_task.reset(task_token)
+
+
+def current_task():
+    """Return the name of the task whose scope the caller is running in, or None"""
+    return _current_task.get()
+
+
+def time_remaining():
+    """Return the seconds left before the current task's deadline, or None without one"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def cancel_requested():
+    """Return whether the current task's run was cancelled"""
+    cancel_event = _cancel_event.get()
+    return cancel_event is not None and cancel_event.is_set()
+
+
+def check_deadline():
+    """
+    Raise DeadlineExceeded if the current task is out of time or its run was
+    cancelled. Called before each LLM and tool call, so work abandoned by the
+    scheduler stops at its next call instead of running on in the background.
+    """
+    if cancel_requested():
+        raise DeadlineExceeded(f"Task {_current_task.get()} was cancelled")
+    remaining = time_remaining()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Task {_current_task.get()} ran out of time")
+
+
+class ModelRouter:
+    """
+    Resolves the candidate models for a call (task route, then agent route, then the
+    default model) and orders them by health: models with a high rolling error rate,
+    or whose p95 latency would overrun the time left before the deadline, are moved
+    behind the ones that still fit.
+    """
+
+    def __init__(self, routes=None, default_model=None, window=WINDOW):
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.default_model = default_model
+        self.window = window
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._fallbacks = {}
+
+    def candidates(self, task_name=None, agent_role=None):
+        """Return the models to try for a call, preferred first"""
+        tiers = tier_models()
+        route = self.routes.get(task_name) or self.routes.get(agent_role) or [self.default_model or "fast"]
+        if isinstance(route, str):
+            route = [route]
+        models = []
+        for model in route:
+            model = tiers.get(model, model)
+            if model not in models:
+                models.append(model)
+        return models
+
+    def record(self, model, latency, ok=True):
+        """Add one call's latency and outcome to model's rolling window"""
+        with self._lock:
+            self._calls.setdefault(model, deque(maxlen=self.window)).append((time.monotonic(), latency, ok))
+
+    def record_fallback(self, model):
+        with self._lock:
+            self._fallbacks[model] = self._fallbacks.get(model, 0) + 1
+
+    def latency(self, model, q=95):
+        with self._lock:
+            latencies = [latency for _, latency, ok in self._calls.get(model, ()) if ok]
+        return _percentile(latencies, q) if latencies else None
+
+    def error_rate(self, model):
+        since = time.monotonic() - ERROR_MEMORY
+        with self._lock:
+            calls = [ok for at, _, ok in self._calls.get(model, ()) if at >= since]
+        if len(calls) < MIN_SAMPLES:
+            return 0.0
+        return calls.count(False) / len(calls)
+
+    def order(self, models, remaining=None):
+        """Return models reordered so the ones expected to succeed in time come first"""
+        healthy = [model for model in models if self.error_rate(model) <= MAX_ERROR_RATE]
+        unhealthy = [model for model in models if model not in healthy]
+        if remaining is None:
+            return healthy + unhealthy
+        fits = [model for model in healthy if (self.latency(model) or 0.0) <= remaining]
+        # Nothing fits: the fastest healthy models give the best chance of finishing
+        at_risk = sorted(
+            (model for model in healthy if model not in fits),
+            key=lambda model: self.latency(model, 50) or 0.0,
+        )
+        return fits + at_risk + unhealthy
+
+    def plan(self, agent_role=None):
+        """Return the ordered models for a call made from the current task"""
+        return self.order(self.candidates(_current_task.get(), agent_role), time_remaining())
+
+    def stats(self):
+        """Return {model: {calls, p50, p95, error_rate, fallbacks}} over each model's window"""
+        with self._lock:
+            models = sorted(set(self._calls) | set(self._fallbacks))
+            fallbacks = dict(self._fallbacks)
+        stats = {}
+        for model in models:
+            with self._lock:
+                calls = len(self._calls.get(model, ()))
+            stats[model] = {
+                "calls": calls,
+                "p50": self.latency(model, 50),
+                "p95": self.latency(model, 95),
+                "error_rate": self.error_rate(model),
+                "fallbacks": fallbacks.get(model, 0),
+            }
+        return stats
+
+
+_router = None
+_router_config = None
+_router_lock = threading.Lock()
+
+
+def model_router():
+    """Return the process-wide router, with routes from MODEL_ROUTES (JSON) over the defaults"""
+    global _router, _router_config
+    config = (os.getenv("MODEL_ROUTES") or "", os.getenv("OPENAI_MODEL_NAME"))
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        if config != _router_config:
+            # Routes follow configuration changes; latency history is kept
+            routes = dict(DEFAULT_ROUTES)
+            routes.update(json.loads(config[0] or "{}"))
+            _router.routes, _router.default_model = routes, config[1]
+            _router_config = config
+        return _router
+
+
+def model_base_url(model):
+    """Return the endpoint for model from MODEL_BASE_URLS (JSON), else OPENAI_BASE_URL"""
+    base_urls = json.loads(os.getenv("MODEL_BASE_URLS") or "{}")
+    return base_urls.get(model) or os.getenv("OPENAI_BASE_URL") or None
@@ -0,0 +1,211 @@
+# Reduces scraped HTML to the venue-relevant text that fits in a token budget
+import logging
+import re
+import threading
+from html.parser import HTMLParser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 1500
+
+# Elements whose content is never useful to the agents
+SKIP_TAGS = {
+    "script", "style", "noscript", "nav", "header", "footer", "aside",
+    "svg", "iframe", "form", "button", "select", "template", "head",
+}
+
+# Elements whose text the plain scrape tool leaves out too (BeautifulSoup's get_text() skips them)
+BASELINE_SKIP_TAGS = {"script", "style", "template"}
+
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "table", "tr",
+    "td", "th", "br", "h1", "h2", "h3", "h4", "h5", "h6", "dl", "dt", "dd",
+    "address", "blockquote", "pre",
+}
+
+VOID_TAGS = {"br", "img", "input", "meta", "link", "hr", "source", "area", "base", "col", "wbr"}
+
+# Keywords used to pull out the sections the Venue Coordinator and Logistic Manager care about
+SECTION_KEYWORDS = {
+    "Capacity": [
+        "capacity", "guests", "attendees", "people", "seated", "standing",
+        "theater", "theatre", "banquet", "reception", "classroom", "sq ft",
+        "square feet", "sqm", "rooms", "ballroom", "hall",
+    ],
+    "Address": [
+        "address", "street", "st.", "avenue", "ave", "road", "blvd", "boulevard",
+        "suite", "located", "location", "directions", "parking", "zip",
+    ],
+    "Pricing": [
+        "price", "pricing", "rate", "rates", "cost", "fee", "fees", "package",
+        "per person", "per hour", "deposit", "minimum", "quote", "$", "€", "£",
+    ],
+    "Contact": [
+        "contact", "phone", "tel", "email", "e-mail", "call us", "inquire",
+        "enquire", "book", "booking", "reservation", "availability",
+    ],
+}
+
+
+def _keyword_pattern(keywords):
+    # Whole words only (plurals allowed), so "tel" doesn't match "hotel" nor "rate" "celebrate";
+    # keywords like "$" or "st." only get a boundary on their word-character ends
+    alternatives = []
+    for keyword in keywords:
+        pattern = re.escape(keyword)
+        if keyword[0].isalnum():
+            pattern = r"\b" + pattern
+        if keyword[-1].isalnum():
+            pattern += r"(?:s|es)?\b"
+        alternatives.append(pattern)
+    return re.compile("|".join(alternatives), re.IGNORECASE)
+
+
+SECTION_PATTERNS = {section: _keyword_pattern(keywords) for section, keywords in SECTION_KEYWORDS.items()}
+
+BOILERPLATE_PATTERNS = re.compile(
+    r"(cookie|privacy policy|terms of (use|service)|all rights reserved|©|copyright|"
+    r"sign in|log in|subscribe|newsletter|skip to (main )?content|follow us|share this)",
+    re.IGNORECASE,
+)
+
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "tokens_before": 0, "tokens_after": 0}
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text as lines, skipping navigation, scripts and other chrome"""
+
+    def __init__(self, skip_tags=SKIP_TAGS):
+        super().__init__(convert_charrefs=True)
+        self.skip_tags = skip_tags
+        self.lines = []
+        self._current = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.skip_tags and tag not in VOID_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.skip_tags:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._current.append(data)
+
+    def _flush(self):
+        line = " ".join("".join(self._current).split())
+        if line:
+            self.lines.append(line)
+        self._current = []
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def count_tokens(text):
+    """Return the token count of text, using tiktoken when it is installed"""
+    try:
+        import tiktoken
+    except ImportError:
+        # Roughly four characters per token for English prose
+        return (len(text) + 3) // 4
+    return len(tiktoken.get_encoding("cl100k_base").encode(text))
+
+
+def _parse_lines(html, skip_tags=SKIP_TAGS):
+    parser = _TextExtractor(skip_tags)
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        # Malformed markup: keep whatever was collected so far
+        parser._flush()
+    return parser.lines
+
+
+def extract_lines(html):
+    """Return the deduplicated visible text lines of an HTML page, minus boilerplate"""
+    seen = set()
+    lines = []
+    for line in _parse_lines(html):
+        key = line.lower()
+        if key in seen or len(line) < 3:
+            continue
+        if len(line) < 120 and BOILERPLATE_PATTERNS.search(line):
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def _truncate_to_budget(text, budget):
+    if count_tokens(text) <= budget:
+        return text
+    # Cut on the character estimate first, then trim whole lines until it fits
+    text = text[: budget * 4]
+    if "\n" in text:
+        text = text.rsplit("\n", 1)[0]
+    while count_tokens(text) > budget and "\n" in text:
+        text = text.rsplit("\n", 1)[0]
+    # Don't leave a section heading with nothing under it
+    head, _, last = text.rstrip().rpartition("\n")
+    if last.startswith("## "):
+        text = head
+    return text.rstrip()
+
+
+def reduce_html(html, token_budget=DEFAULT_TOKEN_BUDGET, source=""):
+    """
+    Strip boilerplate from html, group venue-relevant lines into Capacity, Address,
+    Pricing and Contact sections, then fill the rest of token_budget with the
+    remaining page text. Returns a dict with the reduced text and token counts.
+    """
+    # Baseline is the page's visible text, which is what the plain scrape tool returns
+    tokens_before = count_tokens("\n".join(_parse_lines(html, skip_tags=BASELINE_SKIP_TAGS)))
+    lines = extract_lines(html)
+
+    used = set()
+    parts = []
+    for section, pattern in SECTION_PATTERNS.items():
+        matched = [i for i, line in enumerate(lines) if i not in used and pattern.search(line)]
+        if matched:
+            used.update(matched)
+            parts.append(f"## {section}\n" + "\n".join(lines[i] for i in matched))
+
+    other = [line for i, line in enumerate(lines) if i not in used]
+    if other:
+        parts.append("## Other details\n" + "\n".join(other))
+
+    text = _truncate_to_budget("\n\n".join(parts), token_budget)
+    tokens_after = count_tokens(text)
+
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["tokens_before"] += tokens_before
+        _stats["tokens_after"] += tokens_after
+    logger.info(
+        "Reduced %s from %d to %d tokens (saved %d)",
+        source or "page", tokens_before, tokens_after, tokens_before - tokens_after,
+    )
+    return {
+        "text": text,
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": max(0, tokens_before - tokens_after),
+    }
+
+
+def reduction_stats():
+    """Return the cumulative token counts across all reductions in this process"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["tokens_saved"] = max(0, stats["tokens_before"] - stats["tokens_after"])
+    return stats
@@ -0,0 +1,72 @@
+# Whole-plan memoization keyed on a canonical hash of the event details
+import os
+import threading
+import time
+
+from cache import SQLiteCache, cache_path, make_key
+
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+
+_plan_cache = None
+_plan_cache_lock = threading.Lock()
+
+
+def plan_cache():
+    """Return the process-wide cache of finished plans"""
+    global _plan_cache
+    with _plan_cache_lock:
+        if _plan_cache is None:
+            _plan_cache = SQLiteCache(
+                cache_path("plans.sqlite3"),
+                table="plans",
+                ttl=float(os.getenv("PLAN_CACHE_TTL", DEFAULT_MAX_AGE)),
+                max_entries=int(os.getenv("PLAN_CACHE_MAX_ENTRIES", 200)),
+                compress=True,
+            )
+        return _plan_cache
+
+
+def canonical_event(event_details):
+    """Return event_details with whitespace and case differences normalized away"""
+    canonical = {}
+    for key, value in sorted(event_details.items()):
+        if isinstance(value, str):
+            value = " ".join(value.split()).lower()
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        canonical[key] = value
+    return canonical
+
+
+def plan_key(event_details):
+    return make_key("plan", canonical_event(event_details))
+
+
+def get_cached_plan(event_details, max_age=None):
+    """
+    Return (plan dict, age in seconds) for event_details, or None when there is no
+    plan or it is older than max_age seconds.
+    """
+    entry = plan_cache().get_entry(plan_key(event_details), count=True)
+    if entry is None or not entry["fresh"]:
+        return None
+    age = time.time() - entry["created_at"]
+    if max_age is not None and age > max_age:
+        return None
+    return entry["value"], age
+
+
+def store_plan(event_details, plan):
+    """Remember the to_dict() form of a finished plan for event_details"""
+    plan_cache().set(plan_key(event_details), plan)
+
+
+def format_age(seconds):
+    """Return a short human-readable age such as '5m' or '3h'"""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 60 * 60:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 24 * 60 * 60:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
@@ -0,0 +1,201 @@
+# Persistent, indexed history of finished plans, browsable without re-running any crew
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from cache import cache_path
+
+DEFAULT_PAGE_SIZE = 10
+
+
+def _normalize(text):
+    return " ".join(str(text or "").lower().split())
+
+
+def _to_int(value):
+    match = re.search(r"\d[\d,]*", str(value or ""))
+    return int(match.group().replace(",", "")) if match else None
+
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def _unpack(data):
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+class PlanHistory:
+    """
+    SQLite table with one row per finished run: the event's city, date and topic
+    and the chosen venue's VenueDetails as indexed columns for filtering, and the
+    full plan (PlanResult.to_dict()) and event details as zlib-compressed JSON,
+    only decompressed when a plan is opened.
+    """
+
+    SUMMARY_COLUMNS = (
+        "run_id", "created_at", "event_topic", "event_city", "tentative_date", "expected_participants",
+        "budget", "venue_type", "venue_name", "venue_address", "venue_capacity", "venue_booking_status",
+        "source",
+    )
+
+    def __init__(self, path, max_entries=None):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS plans (
+                    run_id TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    event_topic TEXT,
+                    topic_key TEXT NOT NULL,
+                    event_city TEXT,
+                    city_key TEXT NOT NULL,
+                    tentative_date TEXT,
+                    expected_participants INTEGER,
+                    budget INTEGER,
+                    venue_type TEXT,
+                    venue_name TEXT,
+                    venue_address TEXT,
+                    venue_capacity INTEGER,
+                    venue_booking_status TEXT,
+                    source TEXT NOT NULL,
+                    event_details BLOB NOT NULL,
+                    plan BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS plans_city_created ON plans (city_key, created_at);
+                CREATE INDEX IF NOT EXISTS plans_date ON plans (tentative_date);
+                CREATE INDEX IF NOT EXISTS plans_topic ON plans (topic_key);
+                CREATE INDEX IF NOT EXISTS plans_created_at ON plans (created_at);
+            """)
+
+    def record(self, run_id, event_details, plan, venue_details=None, source="crew"):
+        """Store a finished plan (its to_dict() form) under run_id, replacing any earlier one"""
+        venue = venue_details if isinstance(venue_details, dict) else {}
+        row = {
+            "run_id": run_id,
+            "created_at": time.time(),
+            "event_topic": event_details.get("event_topic"),
+            "topic_key": _normalize(event_details.get("event_topic")),
+            "event_city": event_details.get("event_city"),
+            "city_key": _normalize(event_details.get("event_city")),
+            "tentative_date": event_details.get("tentative_date"),
+            "expected_participants": _to_int(event_details.get("expected_participants")),
+            "budget": _to_int(event_details.get("budget")),
+            "venue_type": event_details.get("venue_type"),
+            "venue_name": venue.get("name"),
+            "venue_address": venue.get("address"),
+            "venue_capacity": _to_int(venue.get("capacity")),
+            "venue_booking_status": venue.get("booking_status"),
+            "source": source,
+            "event_details": _pack(event_details),
+            "plan": _pack(plan),
+        }
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO plans ({', '.join(row)}) VALUES ({', '.join('?' for _ in row)})",
+                tuple(row.values()),
+            )
+            if self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM plans WHERE run_id NOT IN "
+                    "(SELECT run_id FROM plans ORDER BY created_at DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+
+    def _filters(self, city=None, topic=None, date_from=None, date_to=None):
+        where, params = [], []
+        if city:
+            where.append("city_key = ?")
+            params.append(_normalize(city))
+        if topic:
+            # A prefix range rather than LIKE, so the topic index is used
+            prefix = _normalize(topic)
+            where.append("topic_key >= ? AND topic_key < ?")
+            params.extend([prefix, prefix + "\uffff"])
+        if date_from:
+            where.append("tentative_date >= ?")
+            params.append(str(date_from))
+        if date_to:
+            where.append("tentative_date <= ?")
+            params.append(str(date_to))
+        return (" WHERE " + " AND ".join(where) if where else ""), params
+
+    def search(self, city=None, topic=None, date_from=None, date_to=None, limit=DEFAULT_PAGE_SIZE, offset=0):
+        """
+        Return one page of plan summaries (the indexed columns, no plan bodies),
+        newest first. city matches exactly and topic by prefix, both ignoring case;
+        date_from/date_to bound the event's tentative date (YYYY-MM-DD).
+        """
+        where, params = self._filters(city, topic, date_from, date_to)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.SUMMARY_COLUMNS)} FROM plans{where} "
+                "ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, city=None, topic=None, date_from=None, date_to=None):
+        where, params = self._filters(city, topic, date_from, date_to)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM plans{where}", params).fetchone()[0]
+
+    def get(self, run_id):
+        """Return {"run_id", "created_at", "event_details", "plan"} for run_id, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id, created_at, event_details, plan FROM plans WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "run_id": row["run_id"],
+            "created_at": row["created_at"],
+            "event_details": _unpack(row["event_details"]),
+            "plan": _unpack(row["plan"]),
+        }
+
+    def cities(self):
+        """Return the cities with stored plans, one spelling per city"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT MIN(event_city) FROM plans GROUP BY city_key ORDER BY city_key"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete(self, run_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM plans WHERE run_id = ?", (run_id,))
+
+    def stats(self):
+        with self._lock:
+            plans, cities, size = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT city_key), COALESCE(SUM(LENGTH(plan) + LENGTH(event_details)), 0) "
+                "FROM plans"
+            ).fetchone()
+        return {"plans": plans, "cities": cities, "stored_bytes": size}
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def plan_history():
+    """Return the process-wide plan history"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = PlanHistory(
+                cache_path("plan_history.sqlite3"),
+                max_entries=int(os.getenv("PLAN_HISTORY_MAX_ENTRIES", 0)) or None,
+            )
+        return _history
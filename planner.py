@@ -0,0 +1,264 @@
+# Crew construction and execution, independent of the Streamlit UI so it can run off-thread
+import json
+import os
+import time
+
+DEFAULT_MAX_EXECUTION_TIME = 300  # 5 minutes timeout
+
+# Seconds each task may take before it is cut off; within the run's own limit, so
+# the venue task leaves the others time to finish
+DEFAULT_TASK_BUDGETS = {"venue_task": 150, "catering_task": 90, "equipment_task": 90, "marketing_task": 120}
+
+
+def build_crew(max_execution_time=DEFAULT_MAX_EXECUTION_TIME, output_dir=None):
+    """Create the agents, their tasks and the crew that ties them together"""
+    from agents import create_agents
+    from tasks import agent_tasks
+    from crewai import Crew
+
+    # Create agents
+    venue_coordinator, catering_manager, equipment_manager, marketing_communications_agent = create_agents()
+
+    # Create tasks
+    venue_task, catering_task, equipment_task, marketing_task = agent_tasks(
+        venue_coordinator, catering_manager, equipment_manager, marketing_communications_agent,
+        output_dir=output_dir,
+    )
+
+    return Crew(
+        agents=[venue_coordinator, catering_manager, equipment_manager, marketing_communications_agent],
+        tasks=[venue_task, catering_task, equipment_task, marketing_task],
+        verbose=True,
+        max_execution_time=max_execution_time,
+        memory=False  # Disable memory to avoid issues
+    )
+
+
+def task_time_budgets():
+    """Return the per-task time budgets, overridable as JSON in TASK_TIME_BUDGETS"""
+    budgets = dict(DEFAULT_TASK_BUDGETS)
+    if os.getenv("TASK_TIME_BUDGETS"):
+        budgets.update(json.loads(os.environ["TASK_TIME_BUDGETS"]))
+    return budgets
+
+
+def venue_shortlist(event_details, time_budget=None):
+    """Return the ranked venue candidates for event_details, searching for at most time_budget seconds"""
+    from agents import pooled_tools
+    from venue_catalog import venue_catalog
+    from venue_search import SEARCH_TIME_BUDGET, search_venues
+
+    search_tool, _ = pooled_tools()
+    return search_venues(
+        event_details, search_tool, catalog=venue_catalog(), time_budget=time_budget or SEARCH_TIME_BUDGET
+    )
+
+
+def venue_fallback(candidates, event_details):
+    """
+    Return the venue task output to use when the task runs out of time: the best
+    shortlisted candidate as VenueDetails, or None if there were no candidates.
+    """
+    from artifacts import VENUE_TASK
+    from scheduler import StoredTaskOutput
+
+    if not candidates:
+        return None
+    best = candidates[0]
+    address = best["address"] or (f"See {best['link']}" if best["link"] else event_details.get("event_city", ""))
+    details = {
+        "name": best["name"],
+        "address": address,
+        "capacity": best["capacity"] or int(event_details.get("expected_participants") or 0),
+        "booking_status": "Not confirmed - best shortlisted candidate, picked when the venue task ran out of time",
+    }
+    return StoredTaskOutput(VENUE_TASK, "", "Venue Coordinator", json.dumps(details, indent=2), details)
+
+
+def changed_inputs(previous_details, event_details):
+    """
+    Return the crew inputs that differ between two sets of event details, ignoring
+    case and whitespace, including venue_shortlist when an input it is built from changed.
+    """
+    from plan_cache import canonical_event
+    from venue_search import SHORTLIST_INPUTS
+
+    before, after = canonical_event(previous_details), canonical_event(event_details)
+    changed = {key for key in before.keys() | after.keys() if before.get(key) != after.get(key)}
+    if changed & set(SHORTLIST_INPUTS):
+        changed.add("venue_shortlist")
+    return changed
+
+
+def lookup_cached_plan(event_details, max_age=None, run_id=None):
+    """
+    Return the cached PlanResult for event_details, registered in the artifact
+    store under run_id, or None if there is no plan younger than max_age seconds.
+    """
+    from artifacts import RunArtifacts, artifact_store, new_run_id
+    from plan_cache import get_cached_plan
+    from scheduler import PlanResult
+
+    cached = get_cached_plan(event_details, max_age)
+    if cached is None:
+        return None
+    plan, age = cached
+    result = PlanResult.from_dict(plan)
+    result.run_id = run_id or new_run_id()
+    result.cache_age = age
+    artifact_store().put(RunArtifacts.from_result(result.run_id, result))
+    return result
+
+
+def load_past_plan(run_id):
+    """
+    Return (PlanResult, event_details) for a plan in the plan history, registered
+    in the artifact store under its original run_id, or None if it is not there.
+    """
+    from artifacts import RunArtifacts, artifact_store
+    from plan_history import plan_history
+    from scheduler import PlanResult
+
+    entry = plan_history().get(run_id)
+    if entry is None:
+        return None
+    result = PlanResult.from_dict(entry["plan"])
+    result.run_id = run_id
+    result.history_created_at = entry["created_at"]
+    artifact_store().put(RunArtifacts.from_result(run_id, result))
+    return result, entry["event_details"]
+
+
+def execute_with_crewai(event_details, max_execution_time=DEFAULT_MAX_EXECUTION_TIME, reporter=None,
+                        run_id=None, save_files=False, use_cache=True, max_cache_age=None, base_run_id=None,
+                        resume=False, cancel_event=None):
+    """
+    Execute planning for event_details using real CrewAI agents.
+    Errors are raised to the caller rather than reported, since this may run
+    outside the Streamlit script thread. Pass a progress.ProgressReporter as
+    reporter to receive live task, step and token events.
+    The run's outputs are kept in the artifact store under run_id; with
+    save_files they are also written to that run's own directory.
+    Unless use_cache is False, a cached plan for the same inputs younger than
+    max_cache_age seconds is returned without running the crew.
+    With base_run_id, a plan in the plan history, only the tasks affected by the
+    inputs that changed since that plan are run again; the rest keep its outputs.
+    Every finished task is checkpointed under run_id until the run completes; with
+    resume, a run_id that was interrupted (timed out, failed or its process died)
+    continues from its checkpoints, only running the tasks it had not finished.
+    Each task has its own time budget (task_time_budgets()); a venue task that runs
+    out of time falls back to the best shortlisted venue. Setting cancel_event stops
+    the run. A run that times out or is cancelled raises scheduler.PlanInterrupted,
+    whose partial result (the tasks that finished) is kept in the artifact store.
+    """
+    from artifacts import VENUE_TASK, RunArtifacts, artifact_store, new_run_id, run_dir
+    from checkpoints import checkpoint_store
+    from context_compactor import context_token_budget
+    from plan_cache import store_plan
+    from plan_history import plan_history
+    from model_router import DeadlineExceeded, task_scope
+    from scheduler import PlanCancelled, PlanInterrupted, PlanResult, invalidated_tasks, run_task_graph
+    from venue_search import format_shortlist
+    from tracing import instrument_tasks, tracer
+    from venue_catalog import event_scope, venue_catalog
+
+    run_id = run_id or new_run_id()
+    checkpoints = checkpoint_store()
+    checkpoint = checkpoints.load(run_id) if resume else None
+    if checkpoint is not None:
+        # The checkpointed tasks ran with the event details the run started with
+        event_details = checkpoint[0]
+    with tracer().span(
+        "plan",
+        stage="plan",
+        run_id=run_id,
+        event_topic=event_details.get("event_topic"),
+        event_city=event_details.get("event_city"),
+    ) as span:
+        if use_cache:
+            cached = lookup_cached_plan(event_details, max_cache_age, run_id)
+            span.set(cache_hit=cached is not None)
+            if cached is not None:
+                return cached
+
+        event_management_crew = build_crew(max_execution_time, output_dir=run_dir(run_id) if save_files else None)
+        if reporter is not None:
+            from progress import attach_reporter
+            attach_reporter(event_management_crew.tasks, reporter)
+        instrument_tasks(event_management_crew.tasks)
+
+        previous_outputs, changed = {}, None
+        base = plan_history().get(base_run_id) if base_run_id and checkpoint is None else None
+        if checkpoint is not None:
+            previous_outputs, changed = checkpoint[1], set()
+            span.set(resumed_tasks=",".join(sorted(previous_outputs)))
+        elif base is not None:
+            previous_outputs = {output.name: output for output in PlanResult.from_dict(base["plan"]).tasks_output}
+            changed = changed_inputs(base["event_details"], event_details)
+            span.set(base_run_id=base_run_id, changed_inputs=",".join(sorted(changed)))
+
+        # The venue search is the expensive part of the inputs; skip it when the venue task is reused
+        needs_shortlist = (
+            VENUE_TASK not in previous_outputs
+            or VENUE_TASK in invalidated_tasks(event_management_crew.tasks, changed)
+        )
+        def task_done(task, output):
+            checkpoints.save(run_id, event_details, task.name, output)
+
+        def task_reused(task, output):
+            # Reused outputs are checkpointed too, so a resumed run has every finished task
+            task_done(task, output)
+            if reporter is not None:
+                reporter.task_reused(task, output)
+
+        # Execute crew tasks as a dependency graph with per-task deadlines; pages the venue
+        # task scrapes along the way are added to the catalog under this event's city
+        try:
+            with event_scope(event_details):
+                candidates = []
+                if needs_shortlist:
+                    # The search counts against the run's time limit and stops when the run is cancelled
+                    try:
+                        with task_scope("venue_search", time.monotonic() + max_execution_time, cancel_event):
+                            candidates = venue_shortlist(event_details)
+                    except DeadlineExceeded:
+                        raise PlanCancelled(
+                            "Planning was cancelled",
+                            PlanResult([], [], [], incomplete=[task.name for task in event_management_crew.tasks]),
+                        ) from None
+                inputs = dict(event_details, venue_shortlist=format_shortlist(candidates) if needs_shortlist else "")
+                result = run_task_graph(
+                    event_management_crew.tasks,
+                    inputs=inputs,
+                    crew=event_management_crew,
+                    timeout=max_execution_time,
+                    on_task_start=reporter.task_started if reporter is not None else None,
+                    context_budget=context_token_budget() or None,
+                    previous_outputs=previous_outputs,
+                    changed_inputs=changed,
+                    on_task_reused=task_reused,
+                    on_task_done=task_done,
+                    task_budgets=task_time_budgets(),
+                    fallbacks={VENUE_TASK: lambda: venue_fallback(candidates, event_details)},
+                    cancel_event=cancel_event,
+                )
+        except PlanInterrupted as e:
+            # The finished tasks stay viewable now, and checkpointed for a resume
+            span.set(interrupted=type(e).__name__, incomplete_tasks=",".join(e.partial.incomplete))
+            e.partial.run_id = run_id
+            artifact_store().put(RunArtifacts.from_result(run_id, e.partial))
+            raise
+        cut_off = [task.name for task, was_cut_off in zip(result.tasks, result.cut_off) if was_cut_off]
+        span.set(reused_tasks=sum(result.reused), cut_off_tasks=",".join(cut_off))
+        result.run_id = run_id
+        artifacts = RunArtifacts.from_result(run_id, result)
+        artifact_store().put(artifacts)
+        plan = result.to_dict()
+        if not cut_off:
+            # A plan completed with fallbacks is worth keeping, not worth serving again for the same inputs
+            store_plan(event_details, plan)
+        plan_history().record(run_id, event_details, plan, venue_details=artifacts.venue_details)
+        checkpoints.discard(run_id)
+        if VENUE_TASK not in cut_off:
+            venue_catalog().add_venue_details(artifacts.venue_details, event_details)
+        return result
@@ -0,0 +1,170 @@
+# Live progress reporting from crew callbacks to the UI through a thread-safe queue
+import queue
+import threading
+import time
+from collections import deque
+
+TASK_STARTED = "task_started"
+TASK_FINISHED = "task_finished"
+TASK_REUSED = "task_reused"
+STEP = "step"
+TOOL_CALL = "tool_call"
+TOKEN = "token"
+
+# Handlers for streamed LLM tokens look up the reporter of the thread that made the call
+_reporters_by_thread = {}
+_reporters_lock = threading.Lock()
+_stream_handler_registered = False
+
+
+class ProgressReporter:
+    """
+    Collects crew events from worker threads and folds them into a snapshot for the UI.
+    Producers only put events on a bounded queue; the UI drains it at its own pace,
+    so a burst of steps or tokens never triggers extra reruns.
+    """
+
+    def __init__(self, total_tasks=0, max_events=10000, log_size=12, token_tail=600):
+        self.total_tasks = total_tasks
+        self._events = queue.Queue(maxsize=max_events)
+        self._started_at = time.time()
+        self._completed = 0
+        self._steps = 0
+        self._tool_calls = 0
+        self._running = {}
+        self._log = deque(maxlen=log_size)
+        self._tokens = deque(maxlen=token_tail)
+        self._first_output_at = None
+
+    def _put(self, kind, **data):
+        try:
+            self._events.put_nowait((time.time(), kind, data))
+        except queue.Full:
+            # Nobody is draining; dropping progress events is harmless
+            pass
+
+    # Producers, called from crew worker threads
+
+    def task_started(self, task):
+        with _reporters_lock:
+            _reporters_by_thread[threading.get_ident()] = self
+        self._put(TASK_STARTED, task=_task_name(task), agent=_agent_role(task))
+
+    def task_finished(self, output):
+        self._put(TASK_FINISHED, task=_task_name(output), agent=str(getattr(output, "agent", "")))
+
+    def task_reused(self, task, output):
+        self._put(TASK_REUSED, task=_task_name(task), agent=_agent_role(task))
+
+    def step(self, step_output, agent=""):
+        tool = getattr(step_output, "tool", None)
+        if tool:
+            self._put(TOOL_CALL, agent=agent, tool=tool, tool_input=str(getattr(step_output, "tool_input", ""))[:200])
+        else:
+            thought = getattr(step_output, "thought", None) or getattr(step_output, "output", None) or ""
+            self._put(STEP, agent=agent, text=str(thought)[:200])
+
+    def token(self, chunk):
+        self._put(TOKEN, text=chunk)
+
+    # Consumer, called from the Streamlit script thread
+
+    def drain(self, max_events=2000):
+        """Fold queued events into the snapshot and return it"""
+        for _ in range(max_events):
+            try:
+                at, kind, data = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if self._first_output_at is None and kind in (STEP, TOOL_CALL, TOKEN, TASK_FINISHED):
+                self._first_output_at = at
+            if kind == TASK_STARTED:
+                self._running[data["task"]] = data["agent"]
+                self._log.append(f"▶️ {data['agent']} started: {data['task']}")
+            elif kind == TASK_FINISHED:
+                self._running.pop(data["task"], None)
+                self._completed += 1
+                self._log.append(f"✅ {data['agent'] or 'Task'} finished: {data['task']}")
+            elif kind == TASK_REUSED:
+                self._completed += 1
+                self._log.append(f"♻️ Inputs unchanged, reused the earlier output: {data['task']}")
+            elif kind == TOOL_CALL:
+                self._tool_calls += 1
+                self._log.append(f"🛠️ {data['agent']} → {data['tool']}({data['tool_input']})")
+            elif kind == STEP:
+                self._steps += 1
+                if data["text"]:
+                    self._log.append(f"💭 {data['agent']}: {data['text']}")
+            elif kind == TOKEN:
+                self._tokens.extend(data["text"])
+        return self.snapshot()
+
+    def snapshot(self):
+        total = self.total_tasks or 1
+        return {
+            "fraction": min(1.0, self._completed / total),
+            "completed": self._completed,
+            "total": self.total_tasks,
+            "running": dict(self._running),
+            "steps": self._steps,
+            "tool_calls": self._tool_calls,
+            "log": list(self._log),
+            "tokens": "".join(self._tokens),
+            "time_to_first_output": (
+                self._first_output_at - self._started_at if self._first_output_at else None
+            ),
+        }
+
+
+def _task_name(task_or_output):
+    description = getattr(task_or_output, "name", None) or getattr(task_or_output, "description", "") or ""
+    return " ".join(str(description).split())[:60]
+
+
+def _agent_role(task):
+    agent = getattr(task, "agent", None)
+    return getattr(agent, "role", "") if agent is not None else ""
+
+
+def release_thread_reporter():
+    """
+    Stop routing streamed tokens from the calling thread to its reporter. Called by
+    the scheduler once a task's body exits, however it exits, so a worker thread
+    that failed or was cut off doesn't keep (and later feed) its old reporter.
+    """
+    with _reporters_lock:
+        _reporters_by_thread.pop(threading.get_ident(), None)
+
+
+def attach_reporter(tasks, reporter):
+    """Wire agent step callbacks and task callbacks of the crew to reporter"""
+    register_stream_handler()
+    reporter.total_tasks = len(tasks)
+    for task in tasks:
+        task.callback = reporter.task_finished
+        agent = task.agent
+        if agent is not None:
+            role = agent.role
+            agent.step_callback = lambda step_output, role=role: reporter.step(step_output, role)
+
+
+def register_stream_handler():
+    """Forward streamed LLM chunks from CrewAI's event bus to the calling thread's reporter"""
+    global _stream_handler_registered
+    with _reporters_lock:
+        if _stream_handler_registered:
+            return
+        _stream_handler_registered = True
+    try:
+        from crewai.utilities.events import crewai_event_bus
+        from crewai.utilities.events.llm_events import LLMStreamChunkEvent
+    except ImportError:
+        # Older CrewAI without an event bus: progress still comes from step callbacks
+        return
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def _on_chunk(source, event):
+        with _reporters_lock:
+            reporter = _reporters_by_thread.get(threading.get_ident())
+        if reporter is not None:
+            reporter.token(event.chunk)
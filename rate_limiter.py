@@ -0,0 +1,190 @@
+# Shared governor for outbound search and scrape traffic: rate limits, per-host concurrency and retries
+import os
+import random
+import threading
+import time
+
+from model_router import time_remaining
+from tracing import current_span
+
+# Status codes worth retrying: rate limited or a transient server/gateway failure
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# Per provider defaults: requests per second, burst size and concurrent requests per host
+DEFAULT_LIMITS = {
+    "search": {"rate": float(os.getenv("SEARCH_RATE_LIMIT", 5)), "burst": 5,
+               "concurrency": int(os.getenv("SEARCH_MAX_CONCURRENT", 4))},
+    "scrape": {"rate": float(os.getenv("SCRAPE_RATE_LIMIT_PER_HOST", 2)), "burst": 4,
+               "concurrency": int(os.getenv("SCRAPE_MAX_PER_HOST", 4))},
+}
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out waits instead of refusing: each caller reserves a
+    token, going into debt if none are left, and sleeps until its token is due.
+    Callers are therefore served in arrival order at a steady rate.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return the seconds to wait before using it"""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class _HostLimiter:
+    def __init__(self, rate, burst, concurrency):
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.stats = {
+            "requests": 0, "retries": 0, "failures": 0, "in_flight": 0,
+            "queued_seconds": 0.0, "max_queued_seconds": 0.0,
+        }
+
+
+def retry_after(error):
+    """Return the Retry-After delay in seconds carried by an HTTP error, if any"""
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        # email.utils is slow to import and HTTP-date Retry-After values are rare
+        import email.utils
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def is_retryable(error):
+    """Connection failures, timeouts and 408/425/429/5xx responses are retried"""
+    try:
+        import requests
+    except ImportError:
+        requests = None
+    if requests is not None and isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) in RETRYABLE_STATUS
+
+
+class OutboundGovernor:
+    """
+    Every outbound search and scrape request goes through call(), which waits for a
+    token from the host's bucket and then a free connection slot on the host, then runs
+    the request, retrying retryable failures with jittered exponential backoff
+    unless the current task's deadline would pass while waiting.
+    Time spent waiting is tracked per provider and host.
+    """
+
+    def __init__(self, limits=None, max_retries=3, base_delay=0.5, max_delay=30.0):
+        self.limits = limits or DEFAULT_LIMITS
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._limiters = {}
+
+    def _limiter(self, provider, host):
+        with self._lock:
+            key = (provider, host)
+            if key not in self._limiters:
+                limits = self.limits.get(provider, {"rate": 0, "burst": 1, "concurrency": 4})
+                self._limiters[key] = _HostLimiter(limits["rate"], limits["burst"], limits["concurrency"])
+            return self._limiters[key]
+
+    def backoff(self, attempt, error=None):
+        """Full-jitter exponential delay for a retry, or the server's Retry-After if longer"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        requested = retry_after(error) if error is not None else None
+        return min(self.max_delay, max(delay, requested or 0.0))
+
+    def call(self, provider, host, fn):
+        """Return fn() once the provider/host limits allow it, retrying transient failures"""
+        limiter = self._limiter(provider, host)
+        queued = 0.0
+        for attempt in range(self.max_retries + 1):
+            started = time.monotonic()
+            # Wait for the token before taking a slot, so a throttled request doesn't hold
+            # a connection slot that a request with its token in hand could use
+            limiter.bucket.acquire()
+            with limiter.slots:
+                waited = time.monotonic() - started
+                queued += waited
+                with self._lock:
+                    limiter.stats["requests"] += 1
+                    limiter.stats["in_flight"] += 1
+                    limiter.stats["queued_seconds"] += waited
+                    limiter.stats["max_queued_seconds"] = max(limiter.stats["max_queued_seconds"], waited)
+                try:
+                    result = fn()
+                    error = None
+                except Exception as e:
+                    error = e
+                finally:
+                    with self._lock:
+                        limiter.stats["in_flight"] -= 1
+
+            span = current_span()
+            if span is not None:
+                span.set(queued_seconds=round(queued, 4), retries=attempt)
+            if error is None:
+                return result
+            if attempt == self.max_retries or not is_retryable(error):
+                with self._lock:
+                    limiter.stats["failures"] += 1
+                raise error
+            delay = self.backoff(attempt, error)
+            remaining = time_remaining()
+            if remaining is not None and remaining < delay:
+                # The task's deadline would pass while backing off, so give up now
+                with self._lock:
+                    limiter.stats["failures"] += 1
+                raise error
+            with self._lock:
+                limiter.stats["retries"] += 1
+            # Sleep outside the connection slot so other requests to the host can proceed
+            time.sleep(delay)
+
+    def stats(self):
+        """Return {"provider host": counters} including mean seconds queued per request"""
+        with self._lock:
+            stats = {f"{provider} {host}": dict(limiter.stats) for (provider, host), limiter in self._limiters.items()}
+        for values in stats.values():
+            values["mean_queued_seconds"] = values["queued_seconds"] / values["requests"] if values["requests"] else 0.0
+        return stats
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def governor():
+    """Return the process-wide outbound governor"""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = OutboundGovernor(max_retries=int(os.getenv("OUTBOUND_MAX_RETRIES", 3)))
+        return _governor
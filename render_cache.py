@@ -0,0 +1,126 @@
+# Per-run cache of what the results view renders, so Streamlit reruns don't rebuild reports
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+
+class RenderedPlan:
+    """
+    Everything display_results shows for one run, computed once. The simulated
+    venue and marketing summary are built up front since they are always shown;
+    download payloads are only built the first time they are asked for.
+    """
+
+    def __init__(self, run_id, event_details, crew_result=None, artifacts=None):
+        self.run_id = run_id
+        self.event_details = dict(event_details)
+        self.crew_result = crew_result
+        self.artifacts = artifacts
+        self.venue_result = {
+            "name": f"{event_details['event_city']} Convention Center",
+            "address": f"123 Event Street, {event_details['event_city']}",
+            "capacity": event_details['expected_participants'] + 50,
+            "booking_status": "Available"
+        }
+        self.marketing_report = f"""# Marketing Strategy Report
+
+        ## Event Overview
+        - **Event**: {event_details['event_topic']}
+        - **Location**: {event_details['event_city']}
+        - **Date**: {event_details['tentative_date']}
+        - **Expected Attendees**: {event_details['expected_participants']}
+
+        """
+
+    @cached_property
+    def crew_report(self):
+        """The complete agent report, or None without a crew result"""
+        if self.crew_result is None:
+            return None
+        return self.crew_result.raw if hasattr(self.crew_result, 'raw') else str(self.crew_result)
+
+    @cached_property
+    def venue_json(self):
+        return json.dumps(self.venue_result, indent=2)
+
+    @cached_property
+    def crew_venue_details(self):
+        return self.artifacts.venue_details if self.artifacts is not None else None
+
+    @cached_property
+    def crew_venue_json(self):
+        return json.dumps(self.crew_venue_details, indent=2)
+
+    @cached_property
+    def crew_marketing_report(self):
+        return self.artifacts.marketing_report if self.artifacts is not None else ""
+
+    @cached_property
+    def summary_report(self):
+        return f"""# Complete Event Planning Summary
+
+## Event Details
+{json.dumps(self.event_details, indent=2)}
+
+## Results
+{self.marketing_report}
+
+## Venue Details
+{self.venue_json}
+
+## CrewAI Results
+{self.crew_report if self.crew_report is not None else "No CrewAI results available"}
+"""
+
+
+class RenderCache:
+    """In-memory LRU of RenderedPlans keyed by run ID, shared by every session"""
+
+    def __init__(self, max_runs=50):
+        self.max_runs = max_runs
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, run_id, event_details, crew_result=None, artifacts=None):
+        """
+        Return the RenderedPlan for run_id, building it on first use. A run keeps
+        its key for life, but its crew result may arrive after a simulated render
+        (or be replaced), so a different result object rebuilds the entry.
+        """
+        with self._lock:
+            rendered = self._plans.get(run_id)
+            if rendered is not None and rendered.crew_result is crew_result and rendered.artifacts is artifacts:
+                self._plans.move_to_end(run_id)
+                self._hits += 1
+                return rendered
+            self._misses += 1
+        rendered = RenderedPlan(run_id, event_details, crew_result, artifacts)
+        if run_id is None:
+            return rendered
+        with self._lock:
+            self._plans[run_id] = rendered
+            self._plans.move_to_end(run_id)
+            while len(self._plans) > self.max_runs:
+                self._plans.popitem(last=False)
+        return rendered
+
+    def stats(self):
+        with self._lock:
+            return {"runs": len(self._plans), "hits": self._hits, "misses": self._misses}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def render_cache():
+    """Return the process-wide render cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RenderCache(max_runs=int(os.getenv("RENDER_CACHE_MAX_RUNS", 50)))
+        return _cache
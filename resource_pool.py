@@ -0,0 +1,154 @@
+# Process-wide pool of the tools, LLMs and HTTP clients every run reuses
+import os
+import threading
+import time
+
+from cache import make_key
+
+# Resources are rebuilt when any of these change, e.g. after new API keys are entered
+KEY_ENV_VARS = (
+    "OPENAI_API_KEY", "OPENAI_BASE_URL", "OPENAI_MODEL_NAME", "SERPER_API_KEY", "SERPER_BASE_URL",
+    "FAST_MODEL", "STRONG_MODEL", "MODEL_ROUTES", "MODEL_BASE_URLS",
+)
+
+# Seconds between health checks of a pooled resource
+HEALTH_CHECK_INTERVAL = 60
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 20))
+
+
+class _Entry:
+    def __init__(self, value, check):
+        self.value = value
+        self.check = check
+        self.created_at = time.monotonic()
+        self.checked_at = self.created_at
+
+
+class ResourcePool:
+    """
+    Builds each named resource once and hands the same instance to every run and
+    session. Everything is dropped when the API keys or endpoints change; a resource
+    whose health check fails, or that a caller invalidates after an error, is rebuilt
+    on its next use. Resources that are dropped are not closed, since a run still in
+    flight may be using them.
+    """
+
+    def __init__(self, health_check_interval=HEALTH_CHECK_INTERVAL):
+        self.health_check_interval = health_check_interval
+        self._lock = threading.Lock()
+        self._building = {}
+        self._entries = {}
+        self._fingerprint = None
+        self._stats = {"hits": 0, "builds": 0, "refreshes": 0, "unhealthy": 0}
+
+    def _current_fingerprint(self):
+        return make_key(*(os.getenv(name) or "" for name in KEY_ENV_VARS))
+
+    def get(self, name, factory, check=None):
+        """Return the pooled resource called name, building it with factory() if needed"""
+        with self._lock:
+            fingerprint = self._current_fingerprint()
+            if fingerprint != self._fingerprint:
+                if self._fingerprint is not None:
+                    self._stats["refreshes"] += 1
+                self._entries.clear()
+                self._fingerprint = fingerprint
+            entry = self._entries.get(name)
+            if entry is not None and not self._healthy(entry):
+                self._stats["unhealthy"] += 1
+                del self._entries[name]
+                entry = None
+            if entry is not None:
+                self._stats["hits"] += 1
+                return entry.value
+            build_lock = self._building.setdefault(name, threading.Lock())
+
+        # Build outside the pool lock so slow factories don't block other resources
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None:
+                    self._stats["hits"] += 1
+                    return entry.value
+            value = factory()
+            with self._lock:
+                if self._fingerprint == fingerprint:
+                    self._entries[name] = _Entry(value, check)
+                self._stats["builds"] += 1
+            return value
+
+    def _healthy(self, entry):
+        if entry.check is None or time.monotonic() - entry.checked_at < self.health_check_interval:
+            return True
+        entry.checked_at = time.monotonic()
+        try:
+            return bool(entry.check(entry.value))
+        except Exception:
+            return False
+
+    def invalidate(self, name):
+        """Drop a resource so its next use builds a fresh one, e.g. after connection errors"""
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._stats["unhealthy"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["resources"] = sorted(str(name) for name in self._entries)
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def resource_pool():
+    """Return the process-wide resource pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ResourcePool()
+        return _pool
+
+
+def _new_http_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def http_session():
+    """Return the shared requests session, keeping connections alive across page fetches"""
+    return resource_pool().get("http_session", _new_http_session)
+
+
+def _new_llm_http_client():
+    import httpx
+    import litellm
+
+    client = httpx.Client(
+        limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE),
+        timeout=httpx.Timeout(600.0, connect=10.0),
+    )
+    # LiteLLM sends OpenAI-compatible requests through this client when it is set
+    litellm.client_session = client
+    return client
+
+
+def configure_llm_http():
+    """Point LiteLLM at a pooled keep-alive HTTP client; a no-op without litellm/httpx"""
+    try:
+        return resource_pool().get("llm_http_client", _new_llm_http_client, check=lambda client: not client.is_closed)
+    except ImportError:
+        return None
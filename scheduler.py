@@ -0,0 +1,398 @@
+# Runs crew tasks as a dependency graph so independent tasks execute in parallel
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from context_compactor import compact_context
+from model_router import CANCEL_POLL_INTERVAL, DeadlineExceeded, task_scope
+from progress import release_thread_reporter
+from tracing import tracer, wrap_context
+
+
+class TaskGraphError(ValueError):
+    """Raised when task context dependencies cannot be scheduled"""
+
+
+class PlanInterrupted(Exception):
+    """Raised when a run stops before all its tasks finished; partial is a PlanResult of those that did"""
+
+    def __init__(self, message, partial=None):
+        super().__init__(message)
+        self.partial = partial
+
+
+class PlanTimeout(PlanInterrupted, TimeoutError):
+    """The run, or a task without a fallback, ran out of time"""
+
+
+class PlanCancelled(PlanInterrupted):
+    """The run was cancelled"""
+
+
+class StoredTaskOutput:
+    """Task output restored from a serialized plan, with the TaskOutput fields the app uses"""
+
+    def __init__(self, name=None, description="", agent="", raw="", json_dict=None):
+        self.name = name
+        self.description = description
+        self.agent = agent
+        self.raw = raw
+        self.json_dict = json_dict
+
+
+class PlanResult:
+    """Outputs of a scheduled run, in the order the tasks were declared"""
+
+    def __init__(self, tasks, tasks_output, task_durations, run_id=None, context_sizes=None, reused=None,
+                 cut_off=None, incomplete=None):
+        self.tasks = tasks
+        self.tasks_output = tasks_output
+        self.task_durations = task_durations
+        self.run_id = run_id
+        # Per task, the context token counts before and after compaction
+        self.context_sizes = context_sizes or [None] * len(tasks_output)
+        # Per task, whether its output was carried over from an earlier plan instead of run again
+        self.reused = reused or [False] * len(tasks_output)
+        # Per task, whether it missed its time budget and its output is a fallback
+        self.cut_off = cut_off or [False] * len(tasks_output)
+        # Names of the tasks that did not finish, when the run was interrupted
+        self.incomplete = incomplete or []
+        # Seconds since the plan was produced, when it was served from the plan cache
+        self.cache_age = None
+        # When the plan was produced, when it was opened from the plan history
+        self.history_created_at = None
+
+    @property
+    def raw(self):
+        # Like CrewOutput, the final task's output is the result of the run
+        return self.tasks_output[-1].raw if self.tasks_output else ""
+
+    def __str__(self):
+        return self.raw
+
+    def to_dict(self):
+        """Return a JSON-serializable copy of the run's outputs"""
+        return {
+            "run_id": self.run_id,
+            "raw": self.raw,
+            "tasks": [
+                {
+                    "name": getattr(task, "name", None) or getattr(output, "name", None),
+                    "description": getattr(output, "description", ""),
+                    "agent": str(getattr(output, "agent", "")),
+                    "raw": output.raw,
+                    "json_dict": getattr(output, "json_dict", None),
+                }
+                for task, output in zip(self.tasks, self.tasks_output)
+            ],
+            "task_durations": self.task_durations,
+            "context_sizes": self.context_sizes,
+            "reused": self.reused,
+            "cut_off": self.cut_off,
+            "incomplete": self.incomplete,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a result from to_dict() output"""
+        outputs = [
+            StoredTaskOutput(
+                task.get("name"), task.get("description", ""), task.get("agent", ""),
+                task.get("raw", ""), task.get("json_dict"),
+            )
+            for task in data.get("tasks", [])
+        ]
+        return cls(
+            outputs, outputs, data.get("task_durations") or [None] * len(outputs), data.get("run_id"),
+            data.get("context_sizes"), data.get("reused"), data.get("cut_off"), data.get("incomplete"),
+        )
+
+
+def build_task_graph(tasks):
+    """
+    Return {task index: set of dependency indexes} built from each task's context.
+    Raises TaskGraphError if a task depends on one that is not scheduled or on a cycle.
+    """
+    index = {id(task): i for i, task in enumerate(tasks)}
+    graph = {}
+    for i, task in enumerate(tasks):
+        deps = set()
+        for dependency in getattr(task, "context", None) or []:
+            if id(dependency) not in index:
+                raise TaskGraphError(
+                    f"Task '{task.description[:40]}' depends on a task that is not scheduled"
+                )
+            deps.add(index[id(dependency)])
+        graph[i] = deps
+
+    # Kahn's algorithm, only to reject cycles before anything runs
+    remaining = {i: set(deps) for i, deps in graph.items()}
+    while remaining:
+        ready = [i for i, deps in remaining.items() if not deps]
+        if not ready:
+            raise TaskGraphError("Task context dependencies contain a cycle")
+        for i in ready:
+            del remaining[i]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return graph
+
+
+_PLACEHOLDER = re.compile(r"\{([A-Za-z_]\w*)\}")
+
+
+def template_fields(task):
+    """
+    Return the input names a task's description and expected output, and its
+    agent's role, goal and backstory, refer to as {placeholders}. Read from the
+    original templates, so this also works after the inputs were filled in.
+    """
+    templates = [
+        getattr(task, "_original_description", None) or getattr(task, "description", ""),
+        getattr(task, "_original_expected_output", None) or getattr(task, "expected_output", ""),
+    ]
+    agent = getattr(task, "agent", None)
+    if agent is not None:
+        for field in ("role", "goal", "backstory"):
+            templates.append(getattr(agent, f"_original_{field}", None) or getattr(agent, field, ""))
+    return {name for template in templates for name in _PLACEHOLDER.findall(str(template or ""))}
+
+
+def invalidated_tasks(tasks, changed_inputs):
+    """Return the names of tasks whose own templates use one of changed_inputs"""
+    changed_inputs = set(changed_inputs)
+    return {
+        getattr(task, "name", None) or str(i)
+        for i, task in enumerate(tasks)
+        if template_fields(task) & changed_inputs
+    }
+
+
+def same_output(a, b):
+    """Whether two task outputs carry the same result, so their dependents need not run again"""
+    return a.raw == b.raw and getattr(a, "json_dict", None) == getattr(b, "json_dict", None)
+
+
+def interpolate_inputs(tasks, inputs):
+    """Fill the {placeholders} of every task and agent, as Crew.kickoff does"""
+    if not inputs:
+        return
+    agents = []
+    for task in tasks:
+        if hasattr(task, "interpolate_inputs_and_add_conversation_history"):
+            task.interpolate_inputs_and_add_conversation_history(inputs)
+        else:
+            task.interpolate_inputs(inputs)
+        if task.agent is not None and all(task.agent is not agent for agent in agents):
+            agents.append(task.agent)
+    for agent in agents:
+        agent.interpolate_inputs(inputs)
+
+
+def run_task_graph(tasks, inputs=None, crew=None, max_workers=None, timeout=None, on_task_start=None,
+                   context_budget=None, previous_outputs=None, changed_inputs=None, on_task_reused=None,
+                   on_task_done=None, task_budgets=None, fallbacks=None, cancel_event=None):
+    """
+    Execute tasks as soon as every task in their context has finished.
+    Tasks sharing an agent never run at the same time, since an agent's executor
+    is not thread-safe. on_task_start(task) is called from the worker thread right
+    before a task runs. Upstream outputs are joined in the order the task lists
+    them, compacted to context_budget tokens each (see compact_context).
+
+    For incremental re-planning, pass the outputs of an earlier plan by task name as
+    previous_outputs and the inputs that differ from that plan's as changed_inputs.
+    A task is then only run if its templates use a changed input, it has no earlier
+    output, or an upstream task was run again and produced a different output;
+    otherwise its earlier output is reused and on_task_reused(task, output) called.
+    on_task_done(task, output) is called as each task that ran finishes, before any
+    task depending on it is started (e.g. to checkpoint it); fallback outputs of
+    cut-off tasks are not passed to it.
+
+    task_budgets gives tasks, by name, their own time limit in seconds, which
+    together with timeout sets the deadline the task's LLM and tool calls see. A task
+    that misses it is abandoned: fallbacks[name]() then supplies its output if it
+    can (the result marks it cut_off), otherwise the task and everything depending
+    on it are skipped. Raises PlanTimeout if the run exceeds timeout seconds or a
+    task was skipped, and PlanCancelled soon after cancel_event is set; both carry
+    the tasks that did finish as a partial PlanResult.
+    """
+    tasks = list(tasks)
+    graph = build_task_graph(tasks)
+    names = [getattr(task, "name", None) or str(i) for i, task in enumerate(tasks)]
+    previous_outputs = previous_outputs or {}
+    task_budgets = task_budgets or {}
+    fallbacks = fallbacks or {}
+    invalidated = invalidated_tasks(tasks, changed_inputs or ()) if previous_outputs else set(names)
+    if crew is not None:
+        for task in tasks:
+            if task.agent is not None:
+                task.agent.crew = crew
+    interpolate_inputs(tasks, inputs)
+
+    agent_locks = {}
+    for task in tasks:
+        agent_locks.setdefault(id(task.agent), threading.Lock())
+
+    outputs_by_task = {}
+    durations = {}
+    context_sizes = {}
+    task_deadlines = {}
+    # Tasks whose output matches the earlier plan's, reused or not
+    unchanged = set()
+    reused = set()
+    # Tasks that missed their deadline, with and without a fallback output
+    cut_off = set()
+    skipped = set()
+
+    def needs_run(i):
+        if names[i] in invalidated or names[i] not in previous_outputs:
+            return True
+        return not graph[i] <= unchanged
+
+    def run(i):
+        task = tasks[i]
+        name = names[i]
+        with agent_locks[id(task.agent)]:
+            if on_task_start is not None:
+                on_task_start(task)
+            started = time.monotonic()
+            span_attributes = {"stage": f"task:{name}", "task": name, "agent": getattr(task.agent, "role", "")}
+            # task_scope lets the model router pick this task's models and its calls see the deadline
+            with tracer().span("task", **span_attributes) as span, task_scope(name, task_deadlines[i], cancel_event):
+                context = compact_context(task, outputs_by_task, context_budget)
+                context_sizes[i] = {"tokens_before": context["tokens_before"], "tokens_after": context["tokens_after"]}
+                span.set(context_tokens_before=context["tokens_before"], context_tokens_after=context["tokens_after"])
+                output = task.execute_sync(
+                    agent=task.agent,
+                    context=context["text"],
+                    tools=task.tools or getattr(task.agent, "tools", None),
+                )
+            durations[i] = time.monotonic() - started
+        return output
+
+    def work(i):
+        try:
+            return run(i)
+        finally:
+            # on_task_start may have tied this worker thread to a progress reporter
+            release_thread_reporter()
+
+    def finish(i, output, ran=True):
+        outputs_by_task[id(tasks[i])] = output
+        completed.add(i)
+        if ran and on_task_done is not None:
+            on_task_done(tasks[i], output)
+
+    def expire(i):
+        fallback = fallbacks.get(names[i])
+        output = fallback() if fallback is not None else None
+        if output is None:
+            skipped.add(i)
+            return
+        cut_off.add(i)
+        # A stand-in, not the task's output: a resumed run gives the task (and its dependents) another go
+        finish(i, output, ran=False)
+
+    def partial():
+        finished = [i for i in range(len(tasks)) if id(tasks[i]) in outputs_by_task]
+        return PlanResult(
+            [tasks[i] for i in finished],
+            [outputs_by_task[id(tasks[i])] for i in finished],
+            [durations.get(i) for i in finished],
+            context_sizes=[context_sizes.get(i) for i in finished],
+            reused=[i in reused for i in finished],
+            cut_off=[i in cut_off for i in finished],
+            incomplete=[names[i] for i in range(len(tasks)) if i not in finished],
+        )
+
+    deadline = time.monotonic() + timeout if timeout else None
+    pending = dict(graph)
+    running = {}
+    # Futures of tasks cut off at their deadline, still running until their next check
+    abandoned = set()
+    completed = set()
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(tasks) or 1, thread_name_prefix="crew-task")
+    try:
+        while pending or running:
+            ready = sorted(i for i, deps in pending.items() if deps <= completed)
+            for i in ready:
+                del pending[i]
+                if not needs_run(i):
+                    output = previous_outputs[names[i]]
+                    outputs_by_task[id(tasks[i])] = output
+                    unchanged.add(i)
+                    reused.add(i)
+                    completed.add(i)
+                    if on_task_reused is not None:
+                        on_task_reused(tasks[i], output)
+                    continue
+                limits = [deadline]
+                if task_budgets.get(names[i]):
+                    limits.append(time.monotonic() + task_budgets[names[i]])
+                task_deadlines[i] = min((limit for limit in limits if limit is not None), default=None)
+                # Each task runs in a copy of this context so its spans nest under the run
+                running[executor.submit(wrap_context(work), i)] = i
+
+            # Tasks depending on a skipped one can never run
+            blocked = [i for i, deps in pending.items() if deps & skipped]
+            while blocked:
+                for i in blocked:
+                    del pending[i]
+                    skipped.add(i)
+                blocked = [i for i, deps in pending.items() if deps & skipped]
+            if not running:
+                # Reused or cut off tasks may have made more tasks ready without anything to wait for
+                continue
+
+            if cancel_event is not None and cancel_event.is_set():
+                raise PlanCancelled("Planning was cancelled", partial())
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                raise PlanTimeout(f"Task graph did not finish within {timeout} seconds", partial())
+            expired = [
+                future for future, i in running.items() if task_deadlines[i] is not None and now >= task_deadlines[i]
+            ]
+            for future in expired:
+                # The abandoned task stops at its next LLM or tool call, which checks the deadline
+                abandoned.add(future)
+                expire(running.pop(future))
+            if expired:
+                continue
+
+            limits = [deadline, *(task_deadlines[i] for i in running.values())]
+            waits = [limit - now for limit in limits if limit is not None]
+            if cancel_event is not None:
+                waits.append(CANCEL_POLL_INTERVAL)
+            done, _ = wait(running, timeout=min(waits, default=None), return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                try:
+                    output = future.result()
+                except DeadlineExceeded:
+                    # The task noticed the cancellation or its deadline before the scheduler did
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise PlanCancelled("Planning was cancelled", partial())
+                    expire(i)
+                    continue
+                finish(i, output)
+                # An identical output spares its dependents, e.g. the same venue chosen again
+                previous = previous_outputs.get(names[i])
+                if previous is not None and same_output(output, previous):
+                    unchanged.add(i)
+    finally:
+        # Never wait for abandoned or still running tasks; that would undo their deadlines
+        executor.shutdown(wait=not (running or abandoned), cancel_futures=True)
+
+    if skipped:
+        raise PlanTimeout(
+            f"Ran out of time for {', '.join(names[i] for i in sorted(skipped))}", partial()
+        )
+    return PlanResult(
+        tasks,
+        [outputs_by_task[id(task)] for task in tasks],
+        [durations.get(i) for i in range(len(tasks))],
+        context_sizes=[context_sizes.get(i) for i in range(len(tasks))],
+        reused=[i in reused for i in range(len(tasks))],
+        cut_off=[i in cut_off for i in range(len(tasks))],
+    )
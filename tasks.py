@@ -1,5 +1,6 @@
+import os
+
 from crewai import Task
-from tools import agent_tools
 from pydantic import BaseModel
 
 # Define VenueDetails model here since it's used in tasks
@@ -9,11 +10,24 @@ class VenueDetails(BaseModel):
     capacity: int
     booking_status: str
 
-def agent_tasks(venue_coordinator, logistic_manager, marketing_communications_agent):
+def agent_tasks(venue_coordinator, catering_manager, equipment_manager, marketing_communications_agent,
+                output_dir=None):
+    """
+    Build the planning tasks. Outputs are returned to the caller as structured task
+    outputs; pass output_dir (one per run) to also write them to files there.
+    """
 
     #Task 1: Venue Task
     venue_task = Task(
-        description = "Find a venue in {event_city} that meets criteria for {event_topic}",
+        name = "venue_task",
+        # {venue_shortlist} is filled by venue_search before the crew runs, so the agent starts
+        # from ranked candidates instead of searching one query at a time
+        description = (
+            "Find a venue in {event_city} that meets criteria for {event_topic}: a {venue_type} for "
+            "{expected_participants} participants within a budget of {budget}.\n"
+            "Start from this ranked shortlist of candidates; only search further if none of them fit:\n"
+            "{venue_shortlist}"
+        ),
         
         expected_output= "All the details of the specifically chosen venue you found to accommodate the event",
         
@@ -22,41 +36,62 @@ def agent_tasks(venue_coordinator, logistic_manager, marketing_communications_ag
 
         #Outputs the venue details in a JSON format which is utilized and formatted using Pydantic (VenueDetails)
         output_json= VenueDetails,
-        output_file= "venue_details.json",
+        output_file= os.path.join(output_dir, "venue_details.json") if output_dir else None,
 
         agent = venue_coordinator
     )
 
-    #Task 2: Logistics Task
+    #Task 2: Logistics Tasks
+    # Catering and equipment only depend on the chosen venue, not on each other, so
+    # scheduler.run_task_graph runs them side by side once the venue task has finished
 
-    logistics_task = Task(
-        description= "Coordinate catering and equipment for an event with {expected_participants} participants on {tentative_date}.",
-        
-        expected_output= "Confirmations of all logistics arrangements including catering, equipment rental, and setup details.",
+    catering_task = Task(
+        name = "catering_task",
+        description= "Coordinate catering for an event with {expected_participants} participants on {tentative_date}.",
+
+        expected_output= "Confirmation of the catering arrangements including menu, dietary options and serving times.",
+        # Remove human_input to prevent hanging
+        # human_input= True,
+
+        context= [venue_task],
+
+        agent = catering_manager
+    )
+
+    equipment_task = Task(
+        name = "equipment_task",
+        description= "Coordinate equipment rental and setup for an event with {expected_participants} participants on {tentative_date}.",
+
+        expected_output= "Confirmation of the equipment rental and setup details including AV, staging and seating.",
         # Remove human_input to prevent hanging
         # human_input= True,
 
-        # #Async Execution: This task will be executed along with the other tasks as parallel execution 
-        # async_execution= True,
         context= [venue_task],
 
-        agent = logistic_manager
+        agent = equipment_manager
     )
 
     #Task 3: Marketing Task
 
     marketing_task = Task(
+        name = "marketing_task",
         description = "Promote the {event_topic} aiming to engage at least {expected_participants} potential attendees.",
 
         expected_output= "A comprehensive report on marketing activities and attendee engagement formatted as markdown.",
 
         # Remove human_input to prevent hanging
         # human_input= True,
-        # async_execution= True,
-        context= [venue_task, logistics_task],
-        output_file= "marketing_report.md",
+
+        # By default marketing also sees the logistics confirmations. With PARALLEL_MARKETING=1
+        # it only gets the chosen venue and runs alongside the logistics tasks: faster, but the
+        # report can no longer mention catering or equipment details
+        context= (
+            [venue_task] if os.getenv("PARALLEL_MARKETING", "0") == "1"
+            else [venue_task, catering_task, equipment_task]
+        ),
+        output_file= os.path.join(output_dir, "marketing_report.md") if output_dir else None,
 
         agent = marketing_communications_agent
     )
 
-    return venue_task, logistics_task, marketing_task
+    return venue_task, catering_task, equipment_task, marketing_task
@@ -1,4 +1,5 @@
 # Tools for CrewAI agents with fallback for missing packages
+import os
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -6,12 +7,19 @@ warnings.filterwarnings("ignore")
 def agent_tools():
     """Return agent tools - real versions if available, mock versions as fallback"""
     try:
-        from crewai_tools import ScrapeWebsiteTool, SerperDevTool
-        search_tool = SerperDevTool()
-        scrape_tool = ScrapeWebsiteTool()
-        return search_tool, scrape_tool
-    except ImportError:
+        from cached_tools import CachedScrapeWebsiteTool, CachedSerperDevTool
+    except ImportError as e:
+        # Only a missing crewai_tools means offline mode; any other broken import is a bug to surface
+        if (e.name or "").split(".")[0] != "crewai_tools":
+            raise
         # Fallback to mock tools if crewai_tools not available
+        from mock_tools import MockScrapeWebsiteTool, MockSerperDevTool
         search_tool = MockSerperDevTool()
         scrape_tool = MockScrapeWebsiteTool()
-        return search_tool, scrape_tool
\ No newline at end of file
+        return search_tool, scrape_tool
+    # Search results and scraped pages are cached on disk so repeats skip the network
+    # SERPER_BASE_URL points search at another endpoint, e.g. the benchmark stub
+    search_kwargs = {"base_url": os.environ["SERPER_BASE_URL"]} if os.getenv("SERPER_BASE_URL") else {}
+    search_tool = CachedSerperDevTool(**search_kwargs)
+    scrape_tool = CachedScrapeWebsiteTool()
+    return search_tool, scrape_tool
@@ -0,0 +1,272 @@
+# Lightweight tracing of runs, tasks, agent steps, tool calls and LLM calls, exported as OTLP-style JSONL
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+# USD per 1M tokens (input, output), used for cost estimates only
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+# Size at which the trace file is rolled over to a single ".1" backup
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def estimate_cost(model, tokens_in, tokens_out):
+    """Return the estimated USD cost of a call, or None for unknown models"""
+    name = str(model or "").split("/")[-1]
+    for prefix in sorted(MODEL_PRICES, key=len, reverse=True):
+        if name.startswith(prefix):
+            price_in, price_out = MODEL_PRICES[prefix]
+            return (tokens_in * price_in + tokens_out * price_out) / 1_000_000
+    return None
+
+
+class Span:
+    """One timed operation; attributes are plain JSON values"""
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None, start_ns=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_otlp(self):
+        """Return the span in the OpenTelemetry OTLP/JSON span shape"""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items() if value is not None
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _from_otlp_value(value):
+    if "boolValue" in value:
+        return value["boolValue"]
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "doubleValue" in value:
+        return value["doubleValue"]
+    return value.get("stringValue")
+
+
+def span_from_otlp(data):
+    """Rebuild a finished Span from its to_otlp() form"""
+    span = Span(
+        data["name"], data["traceId"], data.get("parentSpanId") or None,
+        {item["key"]: _from_otlp_value(item["value"]) for item in data.get("attributes", [])},
+        int(data["startTimeUnixNano"]),
+    )
+    span.span_id = data["spanId"]
+    span.end_ns = int(data["endTimeUnixNano"])
+    if data.get("status", {}).get("code") == 2:
+        span.error = data["status"].get("message")
+    return span
+
+
+class Tracer:
+    """
+    Records finished spans to a JSONL file and keeps the most recent ones in memory.
+    Once the file reaches max_bytes it is moved to path + ".1" (replacing the
+    previous one) and a new file is started.
+    """
+
+    def __init__(self, path=None, max_spans=5000, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._spans = deque(maxlen=max_spans)
+        self._file = None
+        # The rolled-over file holds the spans just before the current file's
+        for existing in (path + ".1", path) if path else ():
+            if not os.path.exists(existing):
+                continue
+            with open(existing, encoding="utf-8") as f:
+                for line in deque(f, maxlen=max_spans):
+                    try:
+                        self._spans.append(span_from_otlp(json.loads(line)))
+                    except (ValueError, KeyError):
+                        continue
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time the enclosed block as a child of the current span (or a new trace)"""
+        parent = _current_span.get()
+        span = Span(
+            name,
+            parent.trace_id if parent else uuid.uuid4().hex,
+            parent.span_id if parent else None,
+            attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            self.finish(span)
+
+    def record(self, name, start_ns, end_ns=None, **attributes):
+        """Record an already-finished operation as a child of the current span"""
+        parent = _current_span.get()
+        span = Span(
+            name,
+            parent.trace_id if parent else uuid.uuid4().hex,
+            parent.span_id if parent else None,
+            attributes,
+            start_ns,
+        )
+        span.end_ns = end_ns or time.time_ns()
+        self.finish(span)
+        return span
+
+    def finish(self, span):
+        if span.end_ns is None:
+            span.end_ns = time.time_ns()
+        line = json.dumps(span.to_otlp()) + "\n" if self.path else None
+        with self._lock:
+            self._spans.append(span)
+            if line is not None:
+                self._write(line)
+
+    def _write(self, line):
+        # Called with the lock held; the file stays open between spans
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        elif self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._file.close()
+            os.replace(self.path, self.path + ".1")
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(line)
+        self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def spans(self, trace_id=None):
+        with self._lock:
+            spans = list(self._spans)
+        return [span for span in spans if trace_id is None or span.trace_id == trace_id]
+
+    def recent_traces(self, limit=20):
+        """Return root spans of the most recent traces, newest first"""
+        roots = [span for span in self.spans() if span.parent_id is None and span.name == "plan"]
+        return sorted(roots, key=lambda span: span.start_ns, reverse=True)[:limit]
+
+    def stage_stats(self, limit=20):
+        """Return {stage: {count, p50, p95}} of span durations across the recent traces"""
+        trace_ids = {root.trace_id for root in self.recent_traces(limit)}
+        durations = {}
+        for span in self.spans():
+            if span.trace_id in trace_ids:
+                durations.setdefault(span.attributes.get("stage") or span.name, []).append(span.duration)
+        return {
+            stage: {
+                "count": len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+            }
+            for stage, values in sorted(durations.items())
+        }
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def current_span():
+    return _current_span.get()
+
+
+def wrap_context(fn):
+    """Return fn bound to a copy of the current context, so spans nest across threads"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def tracer():
+    """Return the process-wide tracer, exporting to EVENT_PLANNER_TRACE_FILE"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            path = os.getenv("EVENT_PLANNER_TRACE_FILE")
+            if path is None:
+                from cache import cache_path
+                path = cache_path("traces.jsonl")
+            _tracer = Tracer(path or None, max_bytes=int(os.getenv("EVENT_PLANNER_TRACE_MAX_BYTES", DEFAULT_MAX_BYTES)))
+        return _tracer
+
+
+def instrument_tasks(tasks):
+    """Record each agent step as a span, chaining any step callback already set"""
+    for agent in {id(task.agent): task.agent for task in tasks if task.agent is not None}.values():
+        previous = agent.step_callback
+        state = {"last_ns": None}
+        role = agent.role
+
+        def on_step(step_output, previous=previous, state=state, role=role):
+            # A step spans from the previous step (or the task start) until this callback
+            now = time.time_ns()
+            parent = current_span()
+            start = state["last_ns"] if state["last_ns"] and parent and state["last_ns"] > parent.start_ns else (
+                parent.start_ns if parent else now
+            )
+            state["last_ns"] = now
+            tool = getattr(step_output, "tool", None)
+            tracer().record("agent_step", start, now, stage="agent_step", agent=role, tool=tool)
+            if previous is not None:
+                previous(step_output)
+
+        agent.step_callback = on_step
@@ -0,0 +1,257 @@
+# Local catalog of venues seen in past runs, searched before going to the web
+import contextvars
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from cache import cache_path
+
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+# Fresh catalog candidates needed, each with a known capacity and scoring at least MIN_SCORE,
+# to skip the web search
+MIN_CANDIDATES = int(os.getenv("VENUE_CATALOG_MIN_CANDIDATES", 3))
+MIN_SCORE = 0.6
+
+# Where a venue's facts came from, most trustworthy first
+SOURCES = ("venue_details", "page", "search")
+
+_current_event = contextvars.ContextVar("current_event", default=None)
+
+
+def _to_int(value):
+    # Agents sometimes write capacities as "600 guests" or "1,200"
+    match = re.search(r"\d[\d,]*", str(value or ""))
+    return int(match.group().replace(",", "")) if match else None
+
+
+def normalize_city(city):
+    return " ".join(str(city or "").lower().split())
+
+
+@contextmanager
+def event_scope(event_details):
+    """Attribute venues seen in the enclosed block (e.g. scraped pages) to this event's city"""
+    token = _current_event.set(event_details)
+    try:
+        yield
+    finally:
+        _current_event.reset(token)
+
+
+def current_event():
+    return _current_event.get()
+
+
+class VenueCatalog:
+    """
+    SQLite table of venues keyed by city and normalized address (or name), with an
+    FTS5 index over names, addresses, venue types and descriptions. Facts are merged
+    as they arrive, keeping known values over blanks and preferring final
+    VenueDetails over scraped pages over search snippets.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS venues (
+                    id INTEGER PRIMARY KEY,
+                    venue_key TEXT NOT NULL UNIQUE,
+                    city TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    address TEXT,
+                    venue_type TEXT,
+                    capacity INTEGER,
+                    price_amount REAL,
+                    price_per_person INTEGER,
+                    booking_status TEXT,
+                    link TEXT,
+                    description TEXT,
+                    source TEXT NOT NULL,
+                    seen_count INTEGER NOT NULL DEFAULT 1,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS venues_city_capacity ON venues (city, capacity);
+                CREATE INDEX IF NOT EXISTS venues_city_type ON venues (city, venue_type);
+                CREATE INDEX IF NOT EXISTS venues_updated_at ON venues (updated_at);
+                CREATE VIRTUAL TABLE IF NOT EXISTS venues_fts USING fts5(
+                    name, address, venue_type, description, content='venues', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS venues_ai AFTER INSERT ON venues BEGIN
+                    INSERT INTO venues_fts (rowid, name, address, venue_type, description)
+                    VALUES (new.id, new.name, new.address, new.venue_type, new.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS venues_ad AFTER DELETE ON venues BEGIN
+                    INSERT INTO venues_fts (venues_fts, rowid, name, address, venue_type, description)
+                    VALUES ('delete', old.id, old.name, old.address, old.venue_type, old.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS venues_au AFTER UPDATE ON venues BEGIN
+                    INSERT INTO venues_fts (venues_fts, rowid, name, address, venue_type, description)
+                    VALUES ('delete', old.id, old.name, old.address, old.venue_type, old.description);
+                    INSERT INTO venues_fts (rowid, name, address, venue_type, description)
+                    VALUES (new.id, new.name, new.address, new.venue_type, new.description);
+                END;
+            """)
+
+    def _venue_key(self, city, name, address):
+        from venue_search import normalize_address
+
+        if address:
+            return f"{city}|address:{normalize_address(address)}"
+        return f"{city}|name:{' '.join(re.findall(r'[a-z0-9]+', name.lower()))}"
+
+    def upsert(self, city, name, source, address=None, venue_type=None, capacity=None, price=None,
+               booking_status=None, link=None, description=None):
+        """Add a venue, or merge these facts into the one already at the same city and address/name"""
+        city = normalize_city(city)
+        if not city or not name:
+            return
+        key = self._venue_key(city, name, address)
+        fields = {
+            "name": name,
+            "address": address,
+            "venue_type": venue_type,
+            "capacity": _to_int(capacity),
+            "price_amount": price["amount"] if price else None,
+            "price_per_person": int(price["per_person"]) if price else None,
+            "booking_status": booking_status,
+            "link": link,
+            "description": (description or "")[:2000] or None,
+        }
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT * FROM venues WHERE venue_key = ?", (key,)).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO venues (venue_key, city, source, updated_at, "
+                    + ", ".join(fields) + ") VALUES (?, ?, ?, ?, " + ", ".join("?" for _ in fields) + ")",
+                    (key, city, source, now, *fields.values()),
+                )
+                return
+            # A more trustworthy source overwrites facts; a less trustworthy one only fills blanks
+            authoritative = SOURCES.index(source) <= SOURCES.index(row["source"])
+            merged = {
+                name: value if value is not None and (authoritative or row[name] is None) else row[name]
+                for name, value in fields.items()
+            }
+            self._conn.execute(
+                "UPDATE venues SET " + ", ".join(f"{name} = ?" for name in merged)
+                + ", source = ?, seen_count = seen_count + 1, updated_at = ? WHERE id = ?",
+                (*merged.values(), source if authoritative else row["source"], now, row["id"]),
+            )
+
+    def add_venue_details(self, venue_details, event_details, link=None):
+        """Record the venue a run settled on (its VenueDetails output)"""
+        if not isinstance(venue_details, dict):
+            return
+        self.upsert(
+            event_details.get("event_city"),
+            venue_details.get("name"),
+            "venue_details",
+            address=venue_details.get("address"),
+            venue_type=event_details.get("venue_type"),
+            capacity=venue_details.get("capacity"),
+            booking_status=venue_details.get("booking_status"),
+            link=link,
+        )
+
+    def add_candidates(self, candidates, event_details):
+        """Record venues found by the venue search stage"""
+        for candidate in candidates:
+            self.upsert(
+                event_details.get("event_city"),
+                candidate["name"],
+                "search",
+                address=candidate["address"],
+                capacity=candidate["capacity"],
+                price=candidate["price"],
+                link=candidate["link"],
+                description=candidate["snippet"],
+            )
+
+    def add_page(self, url, title, text, event_details):
+        """Record a scraped venue page, if it states enough to be useful"""
+        from venue_search import extract_candidate
+
+        candidate = extract_candidate({"title": title or "", "link": url, "snippet": text})
+        if candidate["capacity"] is None and candidate["address"] is None:
+            return
+        self.upsert(
+            event_details.get("event_city"),
+            candidate["name"],
+            "page",
+            address=candidate["address"],
+            capacity=candidate["capacity"],
+            price=candidate["price"],
+            link=url,
+            description=text,
+        )
+
+    def search(self, city, participants=None, venue_type=None, max_age=DEFAULT_MAX_AGE, limit=50):
+        """
+        Return fresh venues in city as venue_search candidates, those whose name or
+        description matches venue_type first, skipping any known to be too small.
+        """
+        params = [normalize_city(city), time.time() - max_age]
+        query = "SELECT venues.* FROM venues"
+        where = " WHERE venues.city = ? AND venues.updated_at >= ?"
+        if participants:
+            where += " AND (venues.capacity IS NULL OR venues.capacity >= ?)"
+            params.append(int(participants))
+        words = [word for word in re.findall(r"[a-z]+", str(venue_type or "").lower()) if len(word) > 2]
+        order = " ORDER BY venues.seen_count DESC, venues.updated_at DESC"
+        if words:
+            # Left join so venues without a type match are still returned, after the matching ones
+            query += (
+                " LEFT JOIN (SELECT rowid, bm25(venues_fts) AS rank FROM venues_fts WHERE venues_fts MATCH ?)"
+                " AS matches ON matches.rowid = venues.id"
+            )
+            params.insert(0, " OR ".join(f'"{word}"' for word in words))
+            order = " ORDER BY matches.rank IS NULL, matches.rank, venues.seen_count DESC, venues.updated_at DESC"
+        with self._lock:
+            rows = self._conn.execute(query + where + order + " LIMIT ?", (*params, limit)).fetchall()
+        return [
+            {
+                "name": row["name"],
+                "link": row["link"] or "",
+                "snippet": row["description"] or " ".join(filter(None, [row["venue_type"], row["booking_status"]])),
+                "address": row["address"],
+                "capacity": row["capacity"],
+                "price": (
+                    {"amount": row["price_amount"], "per_person": bool(row["price_per_person"])}
+                    if row["price_amount"] is not None else None
+                ),
+                "mentions": row["seen_count"],
+                "source": "catalog",
+            }
+            for row in rows
+        ]
+
+    def stats(self):
+        with self._lock:
+            venues, cities = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT city) FROM venues").fetchone()
+        return {"venues": venues, "cities": cities}
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def venue_catalog():
+    """Return the process-wide venue catalog"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = VenueCatalog(cache_path("venues.sqlite3"))
+        return _catalog
+
+
+def catalog_max_age():
+    return float(os.getenv("VENUE_CATALOG_MAX_AGE", DEFAULT_MAX_AGE))
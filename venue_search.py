@@ -0,0 +1,299 @@
+# Concurrent multi-query venue search that turns search results into a ranked, deduplicated shortlist
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from model_router import CANCEL_POLL_INTERVAL, DeadlineExceeded, cancel_requested, time_remaining
+from tracing import tracer, wrap_context
+from venue_catalog import MIN_CANDIDATES, MIN_SCORE, catalog_max_age
+
+MAX_QUERIES = int(os.getenv("VENUE_SEARCH_MAX_QUERIES", 6))
+SHORTLIST_SIZE = int(os.getenv("VENUE_SHORTLIST_SIZE", 5))
+# Seconds the up-front search may take; queries still out by then are dropped
+SEARCH_TIME_BUDGET = float(os.getenv("VENUE_SEARCH_TIME_BUDGET", 20))
+
+# Event fields the queries and ranking use; the shortlist must be rebuilt when one changes
+SHORTLIST_INPUTS = ("event_city", "event_topic", "venue_type", "expected_participants", "budget")
+
+# Score weights; together they make a 0-1 score
+WEIGHTS = {"capacity": 0.45, "budget": 0.3, "venue_type": 0.2, "mentions": 0.05}
+
+# Spelled-out street words, so "12 Main St." and "12 Main Street" are one venue
+STREET_ABBREVIATIONS = {
+    "st": "street", "str": "street", "ave": "avenue", "av": "avenue", "rd": "road", "blvd": "boulevard",
+    "dr": "drive", "ln": "lane", "ct": "court", "pl": "place", "sq": "square", "pkwy": "parkway",
+    "hwy": "highway", "n": "north", "s": "south", "e": "east", "w": "west",
+}
+
+_CAPACITY = re.compile(
+    r"(?:capacity|accommodat\w*|seat\w*|hosts?|holds?|up to|fits?)\D{0,20}?(\d[\d,]{1,6})"
+    r"|(\d[\d,]{1,6})\s*(?:\+\s*)?(?:guests|people|persons|attendees|seated|standing|pax)",
+    re.IGNORECASE,
+)
+_PRICE = re.compile(r"[$€£]\s?(\d[\d,]*(?:\.\d+)?)\s*(k\b)?(\s*(?:per|/|a)\s*(?:person|guest|head|pp))?", re.IGNORECASE)
+_ADDRESS = re.compile(
+    r"\b(\d{1,5}\s+(?:[A-Z0-9][\w.'-]*\s+){1,4}"
+    r"(?:St|Street|Ave|Avenue|Rd|Road|Blvd|Boulevard|Dr|Drive|Ln|Lane|Way|Pl|Place|Sq|Square|Ct|Court|Pkwy|Parkway|Hwy|Highway)\b\.?)",
+)
+
+
+def capacity_band(participants):
+    """Return the capacity range search results use that holds participants, e.g. 500 -> "500-1000" """
+    participants = max(1, int(participants or 0))
+    for low, high in ((0, 50), (50, 100), (100, 250), (250, 500), (500, 1000), (1000, 2500), (2500, 5000)):
+        if participants < high:
+            return f"{max(low, participants)}-{high}"
+    return f"{participants}+"
+
+
+def query_variants(event_details, max_queries=MAX_QUERIES):
+    """Return distinct search queries for the event's venue, by type, area and capacity band"""
+    city = event_details.get("event_city", "")
+    venue_type = event_details.get("venue_type") or "event venue"
+    participants = event_details.get("expected_participants") or 0
+    topic = event_details.get("event_topic", "")
+    queries = [
+        f"{venue_type} in {city} for {participants} guests",
+        f"{venue_type} {city} capacity {capacity_band(participants)} people",
+        f"event venues downtown {city} {venue_type}",
+        f"{topic} venue {city}",
+        f"{venue_type} near {city} city center rental pricing",
+        f"large event space {city} {capacity_band(participants)} attendees",
+    ]
+    seen = []
+    for query in queries:
+        query = " ".join(query.split())
+        if query.lower() not in (q.lower() for q in seen):
+            seen.append(query)
+    return seen[:max_queries]
+
+
+def parse_search_results(result):
+    """Return [{title, link, snippet}] from a Serper response dict/JSON or the tools' text format"""
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            pass
+    if isinstance(result, dict):
+        return [
+            {"title": item.get("title", ""), "link": item.get("link", ""), "snippet": item.get("snippet", "")}
+            for item in (result.get("organic") or [])
+        ]
+    items = []
+    for block in str(result or "").split("---"):
+        fields = dict(re.findall(r"^(Title|Link|Snippet):\s*(.*)$", block, re.MULTILINE))
+        if fields.get("Title") or fields.get("Link"):
+            items.append({
+                "title": fields.get("Title", ""), "link": fields.get("Link", ""), "snippet": fields.get("Snippet", ""),
+            })
+    return items
+
+
+def normalize_address(address):
+    """Lowercase address, drop punctuation and suite numbers, and spell out street abbreviations"""
+    address = re.sub(r"\b(suite|ste|unit|floor|fl)\b\.?\s*#?\w+", " ", str(address or "").lower())
+    words = re.findall(r"[a-z0-9]+", address)
+    return " ".join(STREET_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def _number(text):
+    return int(float(text.replace(",", "")))
+
+
+def extract_candidate(item):
+    """Return a candidate venue from one search result, with whatever facts its text states"""
+    text = f"{item['title']}. {item['snippet']}"
+    capacities = [_number(a or b) for a, b in _CAPACITY.findall(text)]
+    price = None
+    match = _PRICE.search(text)
+    if match:
+        amount = float(match.group(1).replace(",", "")) * (1000 if match.group(2) else 1)
+        price = {"amount": amount, "per_person": bool(match.group(3))}
+    address = _ADDRESS.search(item["snippet"]) or _ADDRESS.search(item["title"])
+    return {
+        # Result titles usually read "Venue Name - Site" or "Venue Name | Site"
+        "name": re.split(r"\s+[-|–·]\s+", item["title"])[0].strip() or urlsplit(item["link"]).netloc,
+        "link": item["link"],
+        "snippet": item["snippet"],
+        "address": address.group(1).rstrip(".") if address else None,
+        "capacity": max(capacities) if capacities else None,
+        "price": price,
+        "mentions": 1,
+    }
+
+
+def dedupe_key(candidate):
+    if candidate["address"]:
+        return "address:" + normalize_address(candidate["address"])
+    parts = urlsplit(candidate["link"])
+    if parts.netloc:
+        return "link:" + parts.netloc.lower().removeprefix("www.") + parts.path.rstrip("/").lower()
+    return "name:" + " ".join(re.findall(r"[a-z0-9]+", candidate["name"].lower()))
+
+
+def merge_candidates(candidates):
+    """Collapse candidates that share a normalized address (or page), keeping every fact found"""
+    merged = {}
+    for candidate in candidates:
+        key = dedupe_key(candidate)
+        if key not in merged:
+            merged[key] = dict(candidate)
+            continue
+        kept = merged[key]
+        kept["mentions"] += 1
+        for field in ("address", "capacity", "price"):
+            if kept[field] is None:
+                kept[field] = candidate[field]
+        if candidate["capacity"] and kept["capacity"]:
+            kept["capacity"] = max(kept["capacity"], candidate["capacity"])
+    return list(merged.values())
+
+
+def capacity_fit(capacity, participants):
+    """1.0 when the venue holds everyone with at most 50% to spare, falling off either side"""
+    if not capacity or not participants:
+        return 0.5
+    ratio = capacity / participants
+    if ratio < 1:
+        # Too small is worse than too big
+        return max(0.0, ratio - 0.5)
+    if ratio <= 1.5:
+        return 1.0
+    return max(0.2, 1.5 / ratio)
+
+
+def budget_fit(price, participants, budget):
+    """1.0 when the quoted price fits the budget, falling off as it goes over"""
+    if not price or not budget:
+        return 0.5
+    total = price["amount"] * (participants or 1) if price["per_person"] else price["amount"]
+    if total <= budget:
+        return 1.0
+    return max(0.0, 1 - (total - budget) / budget)
+
+
+def venue_type_fit(candidate, venue_type):
+    words = {word for word in re.findall(r"[a-z]+", str(venue_type or "").lower()) if len(word) > 2}
+    if not words:
+        return 0.5
+    text = f"{candidate['name']} {candidate['snippet']}".lower()
+    return sum(1 for word in words if word in text) / len(words)
+
+
+def score_candidate(candidate, event_details):
+    """Set and return the candidate's 0-1 score with the per-criterion fits behind it"""
+    participants = int(event_details.get("expected_participants") or 0)
+    fits = {
+        "capacity": capacity_fit(candidate["capacity"], participants),
+        "budget": budget_fit(candidate["price"], participants, event_details.get("budget")),
+        "venue_type": venue_type_fit(candidate, event_details.get("venue_type")),
+        "mentions": min(1.0, candidate["mentions"] / 3),
+    }
+    candidate["fits"] = fits
+    candidate["score"] = round(sum(WEIGHTS[name] * value for name, value in fits.items()), 3)
+    return candidate["score"]
+
+
+def rank_candidates(candidates, event_details):
+    """Score candidates for the event and return them best first"""
+    for candidate in candidates:
+        score_candidate(candidate, event_details)
+    return sorted(candidates, key=lambda candidate: candidate["score"], reverse=True)
+
+
+def search_venues(event_details, search_tool, catalog=None, max_queries=MAX_QUERIES, shortlist_size=SHORTLIST_SIZE,
+                  max_age=None, time_budget=None):
+    """
+    Return the ranked shortlist of deduplicated venue candidates, best first.
+    With a catalog, venues already known in the city (updated within max_age
+    seconds) are ranked first, and the web is only searched when fewer than
+    MIN_CANDIDATES of them have a known capacity and score MIN_SCORE or better.
+    Otherwise the query variants run through search_tool concurrently, failed
+    queries are skipped, and what they find is added to the catalog. Queries that haven't answered within time_budget
+    seconds (or by the enclosing task scope's deadline) are dropped, and the
+    shortlist is ranked from the results so far; DeadlineExceeded is raised soon
+    after the scope's run is cancelled.
+    """
+    with tracer().span("venue_search", stage="venue_search") as span:
+        known = []
+        if catalog is not None:
+            known = rank_candidates(
+                catalog.search(
+                    event_details.get("event_city"),
+                    event_details.get("expected_participants"),
+                    event_details.get("venue_type"),
+                    max_age=max_age or catalog_max_age(),
+                ),
+                event_details,
+            )
+            span.set(catalog_candidates=len(known))
+            # Venues only seen in search snippets rank on neutral guesses, so they don't count
+            confident = [candidate for candidate in known if candidate["capacity"] and candidate["score"] >= MIN_SCORE]
+            if len(confident) >= MIN_CANDIDATES:
+                span.set(source="catalog")
+                return known[:shortlist_size]
+
+        queries = query_variants(event_details, max_queries)
+
+        def search(query):
+            try:
+                return parse_search_results(search_tool.run(search_query=query))
+            except Exception:
+                return []
+
+        pool = ThreadPoolExecutor(max_workers=len(queries) or 1, thread_name_prefix="venue-search")
+        try:
+            # A context can only be entered by one thread at a time, so each query gets its own copy
+            futures = [pool.submit(wrap_context(search), query) for query in queries]
+            remaining = time_remaining()
+            if remaining is not None:
+                time_budget = remaining if time_budget is None else min(time_budget, remaining)
+            end = None if time_budget is None else time.monotonic() + time_budget
+            done, late = set(), set(futures)
+            while late:
+                if cancel_requested():
+                    raise DeadlineExceeded("Venue search was cancelled")
+                left = None if end is None else end - time.monotonic()
+                if left is not None and left <= 0:
+                    break
+                finished, late = wait(
+                    late, timeout=CANCEL_POLL_INTERVAL if left is None else min(left, CANCEL_POLL_INTERVAL),
+                    return_when=FIRST_COMPLETED,
+                )
+                done |= finished
+        finally:
+            # Late queries finish in the background; their results are no longer waited for
+            pool.shutdown(wait=False, cancel_futures=True)
+        results = [future.result() for future in futures if future in done]
+        found = merge_candidates(extract_candidate(item) for items in results for item in items if item["link"])
+        if catalog is not None:
+            catalog.add_candidates(found, event_details)
+        candidates = rank_candidates(merge_candidates(known + found), event_details)
+        span.set(source="web", queries=len(queries), late_queries=len(late),
+                 results=sum(len(items) for items in results), candidates=len(candidates))
+    return candidates[:shortlist_size]
+
+
+def format_shortlist(candidates):
+    """Render the shortlist as the text handed to the Venue Coordinator"""
+    if not candidates:
+        return "No candidates were found up front; search for venues yourself."
+    lines = []
+    for rank, candidate in enumerate(candidates, 1):
+        facts = [
+            f"address: {candidate['address']}" if candidate["address"] else None,
+            f"capacity: {candidate['capacity']}" if candidate["capacity"] else None,
+            (
+                f"price: ${candidate['price']['amount']:,.0f}{' per person' if candidate['price']['per_person'] else ''}"
+                if candidate["price"] else None
+            ),
+            f"score: {candidate['score']:.2f}",
+        ]
+        lines.append(f"{rank}. {candidate['name']} ({candidate['link']}) - " + ", ".join(f for f in facts if f))
+        if candidate["snippet"]:
+            lines.append(f"   {candidate['snippet']}")
+    return "\n".join(lines)
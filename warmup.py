@@ -0,0 +1,71 @@
+# Optional background pre-warm of the heavy planning stack once the first page has rendered
+import importlib
+import os
+import threading
+import time
+
+# Imported in this order; crewai pulls in litellm and openai itself
+PREWARM_MODULES = ("crewai", "crewai_tools", "litellm", "cached_llm", "cached_tools", "agents", "tasks")
+
+IDLE = "idle"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_lock = threading.Lock()
+_status = {"state": IDLE, "seconds": None, "modules": {}, "resources": False, "error": None}
+
+
+def prewarm_enabled():
+    return os.getenv("EVENT_PLANNER_PREWARM", "1") == "1"
+
+
+def _prewarm(build_resources):
+    started = time.monotonic()
+    try:
+        for module in PREWARM_MODULES:
+            module_started = time.monotonic()
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                # Optional stacks (e.g. crewai_tools) may be missing; planning falls back without them
+                continue
+            with _lock:
+                _status["modules"][module] = time.monotonic() - module_started
+        if build_resources:
+            from agents import pooled_llm, pooled_tools
+
+            pooled_tools()
+            for role in ("Venue Coordinator", "Logistic Manager", "Marketing and Communications Agent"):
+                pooled_llm(role)
+            with _lock:
+                _status["resources"] = True
+        state, error = DONE, None
+    except Exception as e:
+        state, error = FAILED, f"{type(e).__name__}: {e}"
+    with _lock:
+        _status.update(state=state, error=error, seconds=time.monotonic() - started)
+
+
+def start_prewarm(build_resources=False):
+    """
+    Import the planning stack in a daemon thread, once per process, so the first
+    plan doesn't pay for it. With build_resources (API keys set), the pooled tools
+    and LLMs are built too, even if the imports were pre-warmed earlier without them.
+    Returns False if pre-warm is disabled or has nothing left to do.
+    """
+    if not prewarm_enabled():
+        return False
+    with _lock:
+        if _status["state"] == RUNNING:
+            return False
+        if _status["state"] != IDLE and not (build_resources and not _status["resources"]):
+            return False
+        _status["state"] = RUNNING
+    threading.Thread(target=_prewarm, args=(build_resources,), name="prewarm", daemon=True).start()
+    return True
+
+
+def prewarm_status():
+    with _lock:
+        return dict(_status, modules=dict(_status["modules"]))